@@ -24,8 +24,8 @@ from rich.panel import Panel
 from tools.file_manager import file_manager, get_file_manager_tools
 from tools.web_research import web_research, get_web_research_tools, ContentQuality
 from tools.code_interpreter import code_interpreter, get_code_interpreter_tools
-from tools.progress_tracker import progress_tracker
-from tools.rate_limit_manager import rate_limit_manager
+from tools.progress_tracker import get_progress_tracker
+from tools.rate_limit_manager import get_rate_limit_manager
 from llm_providers.provider_handler import llm_handler
 from tools.debug_logger import (
     log_agent_action, log_error, log_llm_call, log_tool_call, 
@@ -33,7 +33,7 @@ from tools.debug_logger import (
 )
 from tools.task_monitor import get_task_monitor, log_task_activity, get_task_status
 import config
-from tools.http_client import http_client, get_http_tools
+from tools.http_client import http_client, get_http_tools, reload_policy as reload_http_policy
 from tools.memory import memory, get_memory_tools
 from bs4 import BeautifulSoup
 from tools.spreadsheet_tools import spreadsheet_tools, get_spreadsheet_tools
@@ -102,7 +102,7 @@ class ManagerAgent:
         if not self.task_id:
             self.task_id = f"task_{uuid.uuid4().hex[:8]}"
         
-        progress_tracker.create_task(
+        get_progress_tracker().create_task(
             self.task_id,
             "Research Task",
             total_steps=10
@@ -110,12 +110,12 @@ class ManagerAgent:
         
         # Add progress callbacks
         self.file_manager.add_progress_callback(
-            progress_tracker.create_file_progress_callback(self.task_id)
+            get_progress_tracker().create_file_progress_callback(self.task_id)
         )
         
         # Setup rate limit callbacks
-        rate_limit_manager.add_callback(
-            progress_tracker.create_api_progress_callback(self.task_id)
+        get_rate_limit_manager().add_callback(
+            get_progress_tracker().create_api_progress_callback(self.task_id)
         )
     
     def _setup_workspace_manager(self):
@@ -384,7 +384,11 @@ Be thorough, methodical, and adaptive in your approach."""
                 return json.dumps(result, indent=2)
 
             elif function_name == 'ingest':
-                result = doc_ingestion.ingest(**arguments)
+                result = await doc_ingestion.aingest(**arguments)
+                return json.dumps(result, indent=2)
+
+            elif function_name == 'ingest_many':
+                result = await doc_ingestion.aingest_many(**arguments)
                 return json.dumps(result, indent=2)
 
             elif function_name == 'extract_with_patterns':
@@ -415,6 +419,14 @@ Be thorough, methodical, and adaptive in your approach."""
                 result = github_connector.comment_issue(**arguments)
                 return json.dumps(result, indent=2)
 
+            elif function_name == 'github_create_issues_bulk':
+                result = github_connector.create_issues_bulk(**arguments)
+                return json.dumps(result, indent=2)
+
+            elif function_name == 'github_comment_issues_bulk':
+                result = github_connector.comment_issues_bulk(**arguments)
+                return json.dumps(result, indent=2)
+
             elif function_name == 'create_task_venv':
                 result = venv_manager.create_task_venv(**arguments)
                 return json.dumps(result, indent=2)
@@ -586,7 +598,7 @@ Be thorough, methodical, and adaptive in your approach."""
                     self.web_research_tool.set_task_id(self.task_id)
                 
                 self.web_research_tool.add_progress_callback(
-                    progress_tracker.create_browser_progress_callback(self.task_id)
+                    get_progress_tracker().create_browser_progress_callback(self.task_id)
                 )
                 
                 # Start the browser
@@ -632,11 +644,11 @@ Be thorough, methodical, and adaptive in your approach."""
         
         try:
             # Start progress tracking
-            progress_tracker.start_task(self.task_id, "Initializing research task")
-            progress_tracker.start_live_display()
+            get_progress_tracker().start_task(self.task_id, "Initializing research task")
+            get_progress_tracker().start_live_display()
             
             # Update progress
-            progress_tracker.update_task(
+            get_progress_tracker().update_task(
                 self.task_id,
                 current_step="Analyzing task requirements",
                 current_step_num=1
@@ -673,8 +685,8 @@ Be thorough, methodical, and adaptive in your approach."""
             task_monitor.mark_task_completed()
             
             # Complete progress tracking
-            progress_tracker.complete_task(self.task_id, "Research task completed")
-            progress_tracker.stop_live_display()
+            get_progress_tracker().complete_task(self.task_id, "Research task completed")
+            get_progress_tracker().stop_live_display()
             
             # Clean up browser
             if self.web_research_tool:
@@ -710,8 +722,8 @@ Be thorough, methodical, and adaptive in your approach."""
                 "error": error_msg
             }, success=False)
             
-            progress_tracker.fail_task(self.task_id, str(e))
-            progress_tracker.stop_live_display()
+            get_progress_tracker().fail_task(self.task_id, str(e))
+            get_progress_tracker().stop_live_display()
             
             # Clean up browser on error
             if self.web_research_tool:
@@ -740,7 +752,7 @@ Be thorough, methodical, and adaptive in your approach."""
                         "task_id": research.get('task_id')
                     }, indent=2)
                 # If research failed, fall back to iterative loop
-            progress_tracker.start_task(self.task_id, "Planning task")
+            get_progress_tracker().start_task(self.task_id, "Planning task")
             tools = self._get_available_tools()
             messages: List[Dict[str, Any]] = [
                 {"role": "system", "content": self.system_prompt},
@@ -751,10 +763,10 @@ Be thorough, methodical, and adaptive in your approach."""
                 step += 1
                 if self._is_cancelled():
                     return "Task cancelled"
-                progress_tracker.update_task(self.task_id, current_step=f"Step {step}: Reasoning", current_step_num=min(step, 10))
+                get_progress_tracker().update_task(self.task_id, current_step=f"Step {step}: Reasoning", current_step_num=min(step, 10))
                 def on_delta(evt: Dict[str, Any]):
                     try:
-                        asyncio.create_task(event_bus.publish(self.task_id, {"type": "llm_delta", "data": evt}))
+                        event_bus.publish_nowait(self.task_id, {"type": "llm_delta", "data": evt})
                     except Exception:
                         pass
                 response = llm_handler.call_llm(
@@ -785,9 +797,9 @@ Be thorough, methodical, and adaptive in your approach."""
                     # Execute tool calls sequentially (could be parallelized later)
                     for tool_call in tool_calls:
                         tool_name = tool_call.get('function', {}).get('name')
-                        await event_bus.publish(self.task_id, {"type": "tool_start", "name": tool_name, "args": tool_call.get('function', {}).get('arguments')})
+                        event_bus.publish_nowait(self.task_id, {"type": "tool_start", "name": tool_name, "args": tool_call.get('function', {}).get('arguments')})
                         tool_result = await self._execute_tool_call(tool_call)
-                        await event_bus.publish(self.task_id, {"type": "tool_end", "name": tool_name, "result": tool_result})
+                        event_bus.publish_nowait(self.task_id, {"type": "tool_end", "name": tool_name, "result": tool_result})
                         messages.append({
                             "role": "tool",
                             "tool_call_id": tool_call.get('id'),
@@ -860,7 +872,7 @@ Be thorough, methodical, and adaptive in your approach."""
     
     async def _create_research_plan(self, task_description: str) -> Dict[str, Any]:
         """Create a comprehensive research plan."""
-        progress_tracker.update_task(
+        get_progress_tracker().update_task(
             self.task_id,
             current_step="Creating research plan",
             current_step_num=2
@@ -944,7 +956,7 @@ Be thorough, methodical, and adaptive in your approach."""
     
     async def _execute_research_phases(self, plan: Dict[str, Any]) -> Dict[str, Any]:
         """Execute all research phases."""
-        progress_tracker.update_task(
+        get_progress_tracker().update_task(
             self.task_id,
             current_step="Executing research phases",
             current_step_num=3
@@ -953,7 +965,7 @@ Be thorough, methodical, and adaptive in your approach."""
         all_results = []
         
         for i, phase in enumerate(plan['phases']):
-            progress_tracker.update_task(
+            get_progress_tracker().update_task(
                 self.task_id,
                 current_step=f"Phase {i+1}: {phase['name']}",
                 current_step_num=4 + i
@@ -1051,6 +1063,7 @@ Be thorough, methodical, and adaptive in your approach."""
                                 import os
                                 old_allow = os.getenv('ALLOW_ALL_HTTP')
                                 os.environ['ALLOW_ALL_HTTP'] = 'true'
+                                reload_http_policy()
                                 try:
                                     resp = http_client.http_request(method='GET', url=url)
                                 finally:
@@ -1058,6 +1071,7 @@ Be thorough, methodical, and adaptive in your approach."""
                                         os.environ.pop('ALLOW_ALL_HTTP', None)
                                     else:
                                         os.environ['ALLOW_ALL_HTTP'] = old_allow
+                                    reload_http_policy()
                                 body = (resp.get('text') or '') if isinstance(resp, dict) else ''
                                 if not body:
                                     continue
@@ -1191,7 +1205,7 @@ Be thorough, methodical, and adaptive in your approach."""
     
     async def _create_comprehensive_report(self, research_results: Dict[str, Any]) -> str:
         """Create a comprehensive research report with enhanced formatting."""
-        progress_tracker.update_task(
+        get_progress_tracker().update_task(
             self.task_id,
             current_step="Creating comprehensive report",
             current_step_num=8
@@ -1233,7 +1247,7 @@ Be thorough, methodical, and adaptive in your approach."""
             
             if report_result.get('success'):
                 logger.info(f"Enhanced research report created: {report_result.get('main_report_path')}")
-                progress_tracker.update_task(
+                get_progress_tracker().update_task(
                     self.task_id,
                     current_step="Enhanced report completed",
                     current_step_num=9
@@ -1251,7 +1265,7 @@ Be thorough, methodical, and adaptive in your approach."""
     
     async def _create_basic_report(self, research_results: Dict[str, Any]) -> str:
         """Create a basic research report as fallback."""
-        progress_tracker.update_task(
+        get_progress_tracker().update_task(
             self.task_id,
             current_step="Creating basic report",
             current_step_num=8
@@ -1296,7 +1310,7 @@ Be thorough, methodical, and adaptive in your approach."""
             output_path=report_filename
         )
         
-        progress_tracker.update_task(
+        get_progress_tracker().update_task(
             self.task_id,
             current_step="Basic report completed",
             current_step_num=9
@@ -1313,7 +1327,7 @@ Be thorough, methodical, and adaptive in your approach."""
 
             def on_delta(evt: Dict[str, Any]):
                 try:
-                    asyncio.create_task(event_bus.publish(self.task_id, {"type": "llm_delta", "data": evt}))
+                    event_bus.publish_nowait(self.task_id, {"type": "llm_delta", "data": evt})
                 except Exception:
                     pass
 
@@ -1325,7 +1339,7 @@ Be thorough, methodical, and adaptive in your approach."""
                     if isinstance(content, str) and len(content) > 400:
                         content = content[:400] + "…"
                     preview_msgs.append({"role": m.get("role"), "content": content})
-                asyncio.create_task(event_bus.publish(self.task_id, {"type": "llm_request", "provider": provider, "model": model, "messages": preview_msgs, "has_tools": bool(tools)}))
+                event_bus.publish_nowait(self.task_id, {"type": "llm_request", "provider": provider, "model": model, "messages": preview_msgs, "has_tools": bool(tools)})
             except Exception:
                 pass
 
@@ -1351,7 +1365,7 @@ Be thorough, methodical, and adaptive in your approach."""
                 if msg.get("tool_calls"):
                     preview["tool_calls"] = [tc.get("function", {}).get("name") for tc in msg.get("tool_calls", [])]
                 log_llm_call(self.task_id, provider, model, messages, response, duration)
-                asyncio.create_task(event_bus.publish(self.task_id, {"type": "llm_response", "duration_s": round(duration, 3), "preview": preview}))
+                event_bus.publish_nowait(self.task_id, {"type": "llm_response", "duration_s": round(duration, 3), "preview": preview})
             except Exception:
                 pass
 
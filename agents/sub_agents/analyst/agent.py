@@ -161,6 +161,10 @@ Always focus on accuracy, objectivity, and clear communication of findings."""
                 result = doc_ingestion.ingest(**arguments)
                 return json.dumps(result, indent=2)
 
+            elif function_name == 'ingest_many':
+                result = doc_ingestion.ingest_many(**arguments)
+                return json.dumps(result, indent=2)
+
             elif function_name == 'extract_with_patterns':
                 result = structured_extraction.extract_with_patterns(**arguments)
                 return json.dumps(result, indent=2)
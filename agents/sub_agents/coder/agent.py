@@ -173,6 +173,10 @@ Always follow best practices for code quality, security, and maintainability."""
                 result = doc_ingestion.ingest(**arguments)
                 return json.dumps(result, indent=2)
 
+            elif function_name == 'ingest_many':
+                result = doc_ingestion.ingest_many(**arguments)
+                return json.dumps(result, indent=2)
+
             elif function_name == 'render_html_report':
                 result = html_reporter.render(**arguments)
                 return json.dumps(result, indent=2)
@@ -116,7 +116,11 @@ Always prioritize accuracy, comprehensiveness, and source diversity in your rese
                 return json.dumps(result, indent=2)
             
             elif function_name == 'ingest':
-                result = doc_ingestion.ingest(**arguments)
+                result = await doc_ingestion.aingest(**arguments)
+                return json.dumps(result, indent=2)
+
+            elif function_name == 'ingest_many':
+                result = await doc_ingestion.aingest_many(**arguments)
                 return json.dumps(result, indent=2)
 
             elif function_name == 'extract_with_patterns':
@@ -16,7 +16,7 @@ from contextlib import asynccontextmanager
 import time
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks, Request, WebSocket, WebSocketDisconnect
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
 from loguru import logger
@@ -32,8 +32,8 @@ load_dotenv()
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from agents.manager_agent import ManagerAgent
-from tools.progress_tracker import progress_tracker
-from tools.rate_limit_manager import rate_limit_manager
+from tools.progress_tracker import get_progress_tracker
+from tools.rate_limit_manager import get_rate_limit_manager
 from tools.task_monitor import get_task_status as get_task_monitor_status
 from tools.event_bus import event_bus
 import config
@@ -321,6 +321,9 @@ async def execute_task_background(task_id: str, task_request: TaskRequest):
         active_tasks[task_id]["status"] = "failed"
         active_tasks[task_id]["error_message"] = error_msg
         active_tasks[task_id]["completed_at"] = datetime.now().isoformat()
+    finally:
+        # Let websocket subscribers finish and release the task's event buffer
+        event_bus.close(task_id)
 
 def get_system_resources() -> Dict[str, Any]:
     """Get system resource information."""
@@ -352,6 +355,32 @@ def get_system_resources() -> Dict[str, Any]:
             "disk_free_gb": "N/A"
         }
 
+def build_task_status(task_id: str, task_info: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the status payload for a task (shape of TaskStatusResponse)."""
+    progress = 0.0
+    current_step = "Initializing"
+    estimated_completion = None
+    
+    if task_info["status"] == "running":
+        # Try to get progress from progress tracker
+        task_progress = get_progress_tracker().get_task_progress(task_id)
+        if task_progress:
+            progress = task_progress.progress
+            current_step = task_progress.current_step
+            if task_progress.estimated_completion:
+                estimated_completion = task_progress.estimated_completion.isoformat()
+    
+    return {
+        "task_id": task_id,
+        "status": task_info["status"],
+        "progress": progress,
+        "current_step": current_step,
+        "start_time": task_info["start_time"] if task_info.get("start_time") else task_info["created_at"],
+        "estimated_completion": estimated_completion,
+        "error_message": task_info.get("error_message"),
+        "result": task_results.get(task_id)
+    }
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager."""
@@ -394,7 +423,10 @@ if os.path.isdir(FRONTEND_DIR):
     async def _root_redirect():
         return RedirectResponse(url="/app/")
 
-@app.post("/execute", response_model=TaskResponse)
+# Internal endpoints build their payloads from trusted server-side state, so
+# they return ORJSONResponse directly instead of re-validating through
+# response_model; the models are still published in the OpenAPI schema.
+@app.post("/execute", responses={200: {"model": TaskResponse}})
 async def execute_task(task_request: TaskRequest, background_tasks: BackgroundTasks):
     """
     Execute a task using the Deep Action Agent.
@@ -433,12 +465,13 @@ async def execute_task(task_request: TaskRequest, background_tasks: BackgroundTa
         
         logger.info(f"Task {task_id} queued for execution: {task_request.task_description}")
         
-        return TaskResponse(
-            task_id=task_id,
-            status="queued",
-            message=f"Task '{task_request.task_description}' has been queued for execution",
-            estimated_duration=estimated_duration
-        )
+        return ORJSONResponse(content={
+            "task_id": task_id,
+            "status": "queued",
+            "message": f"Task '{task_request.task_description}' has been queued for execution",
+            "workspace_path": None,
+            "estimated_duration": estimated_duration
+        })
         
     except Exception as e:
         logger.error(f"Failed to queue task: {e}")
@@ -457,7 +490,7 @@ async def health_check():
     """
     try:
         # Get API health report
-        api_health = rate_limit_manager.get_health_report()
+        api_health = get_rate_limit_manager().get_health_report()
         
         # Get system resources
         system_resources = get_system_resources()
@@ -491,7 +524,7 @@ async def health_check():
         logger.error(f"Health check failed: {e}")
         raise HTTPException(status_code=500, detail=f"Health check failed: {str(e)}")
 
-@app.get("/status/{task_id}", response_model=TaskStatusResponse)
+@app.get("/status/{task_id}", responses={200: {"model": TaskStatusResponse}})
 async def get_task_status(task_id: str):
     """
     Get the status of a specific task.
@@ -508,37 +541,7 @@ async def get_task_status(task_id: str):
         if task_id not in active_tasks:
             raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
         
-        task_info = active_tasks[task_id]
-        
-        # Get progress information if task is running
-        progress = 0.0
-        current_step = "Initializing"
-        estimated_completion = None
-        
-        if task_info["status"] == "running":
-            # Try to get progress from progress tracker
-            task_progress = progress_tracker.get_task_progress(task_id)
-            if task_progress:
-                progress = task_progress.progress
-                current_step = task_progress.current_step
-                if task_progress.estimated_completion:
-                    estimated_completion = task_progress.estimated_completion.isoformat()
-        
-        # Get result if task is completed
-        result = None
-        if task_id in task_results:
-            result = task_results[task_id]
-        
-        return TaskStatusResponse(
-            task_id=task_id,
-            status=task_info["status"],
-            progress=progress,
-            current_step=current_step,
-            start_time=task_info["start_time"] if task_info.get("start_time") else task_info["created_at"],
-            estimated_completion=estimated_completion,
-            error_message=task_info.get("error_message"),
-            result=result
-        )
+        return ORJSONResponse(content=build_task_status(task_id, active_tasks[task_id]))
         
     except HTTPException:
         raise
@@ -558,7 +561,7 @@ async def get_task_monitor(task_id: str):
         monitor_status = get_task_monitor_status(task_id)
         
         # Get progress info
-        progress_info = progress_tracker.get_task_progress(task_id)
+        progress_info = get_progress_tracker().get_task_progress(task_id)
         
         # Convert progress_info to dict if it's an object
         if progress_info and hasattr(progress_info, '__dict__'):
@@ -602,7 +605,7 @@ async def sse_events(task_id: str, request: Request):
         while True:
             if await request.is_disconnected():
                 break
-            prog = progress_tracker.get_task_progress(task_id)
+            prog = get_progress_tracker().get_task_progress(task_id)
             if prog and getattr(prog, 'current_step_num', -1) != last_progress:
                 last_progress = getattr(prog, 'current_step_num', -1)
                 data = {
@@ -619,13 +622,21 @@ async def sse_events(task_id: str, request: Request):
 @app.websocket("/ws/{task_id}")
 async def websocket_events(websocket: WebSocket, task_id: str):
     await websocket.accept()
+    if task_id not in active_tasks:
+        await websocket.close(code=4404)
+        return
+    events = event_bus.subscribe_batches(task_id)
     try:
-        async for evt in event_bus.subscribe(task_id):
-            await websocket.send_json(evt)
+        # Each frame carries every event queued since the last send
+        async for batch in events:
+            await websocket.send_json(batch)
+        await websocket.close()
     except WebSocketDisconnect:
         return
+    finally:
+        await events.aclose()
 
-@app.get("/tasks", response_model=List[TaskStatusResponse])
+@app.get("/tasks", responses={200: {"model": List[TaskStatusResponse]}})
 async def list_tasks():
     """
     List all tasks with their current status.
@@ -634,37 +645,9 @@ async def list_tasks():
     current status and basic information.
     """
     try:
-        tasks = []
-        
-        for task_id, task_info in active_tasks.items():
-            # Get progress information
-            progress = 0.0
-            current_step = "Initializing"
-            estimated_completion = None
-            
-            if task_info["status"] == "running":
-                task_progress = progress_tracker.get_task_progress(task_id)
-                if task_progress:
-                    progress = task_progress.progress
-                    current_step = task_progress.current_step
-                    if task_progress.estimated_completion:
-                        estimated_completion = task_progress.estimated_completion.isoformat()
-            
-            # Get result if available
-            result = task_results.get(task_id)
-            
-            tasks.append(TaskStatusResponse(
-                task_id=task_id,
-                status=task_info["status"],
-                progress=progress,
-                current_step=current_step,
-                start_time=task_info["start_time"] if task_info.get("start_time") else task_info["created_at"],
-                estimated_completion=estimated_completion,
-                error_message=task_info.get("error_message"),
-                result=result
-            ))
-        
-        return tasks
+        tasks = [build_task_status(task_id, task_info) for task_id, task_info in active_tasks.items()]
+        
+        return ORJSONResponse(content=tasks)
         
     except Exception as e:
         logger.error(f"Failed to list tasks: {e}")
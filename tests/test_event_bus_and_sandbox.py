@@ -25,8 +25,177 @@ def test_event_bus_publish_subscribe():
     asyncio.run(run_test())
 
 
+def test_event_bus_buffer_drops_oldest():
+    from tools.event_bus import EventBus
+
+    async def run_test():
+        bus = EventBus(maxsize=2)
+        for i in range(3):
+            bus.publish_nowait("t", {"n": i})
+        events = bus.subscribe("t")
+        assert [await events.__anext__(), await events.__anext__()] == [{"n": 1}, {"n": 2}]
+
+    asyncio.run(run_test())
+
+
+def test_event_bus_fans_out_to_every_subscriber():
+    from tools.event_bus import EventBus
+
+    async def run_test():
+        bus = EventBus()
+        first, second = bus.subscribe("t"), bus.subscribe("t")
+        pending = [asyncio.create_task(first.__anext__()), asyncio.create_task(second.__anext__())]
+        await asyncio.sleep(0.01)
+        bus.publish_nowait("t", {"n": 1})
+        assert await asyncio.wait_for(asyncio.gather(*pending), timeout=1) == [{"n": 1}, {"n": 1}]
+
+    asyncio.run(run_test())
+
+
+def test_event_bus_close_ends_subscribers_and_drops_channel():
+    from tools.event_bus import EventBus
+
+    async def run_test():
+        bus = EventBus()
+        received = []
+
+        async def reader():
+            async for evt in bus.subscribe("t"):
+                received.append(evt)
+
+        reader_task = asyncio.create_task(reader())
+        await asyncio.sleep(0.01)
+        bus.publish_nowait("t", {"n": 1})
+        bus.close("t")
+        await asyncio.wait_for(reader_task, timeout=1)
+        assert received == [{"n": 1}]
+        assert "t" not in bus._channels
+
+    asyncio.run(run_test())
+
+
+def test_event_bus_does_not_leak_channels_for_finished_or_idle_subscribers():
+    from tools.event_bus import EventBus
+
+    async def run_test():
+        bus = EventBus()
+        bus.publish_nowait("done", {"n": 1})
+        bus.close("done")
+        assert "done" not in bus._channels
+        # A late subscriber to a closed task ends at once
+        assert [evt async for evt in bus.subscribe("done")] == []
+        assert "done" not in bus._channels
+
+        # A subscriber that gives up on a task nobody published to takes its channel along
+        events = bus.subscribe("idle")
+        pending = asyncio.create_task(events.__anext__())
+        await asyncio.sleep(0.01)
+        pending.cancel()
+        await asyncio.gather(pending, return_exceptions=True)
+        await events.aclose()
+        assert "idle" not in bus._channels
+
+    asyncio.run(run_test())
+
+
 def test_run_with_limits_timeout():
     completed = run_with_limits(["python", "-c", "import time; time.sleep(1)"], timeout=0.1)
     assert completed.returncode != 0
     assert "Timed out" in completed.stderr
 
+
+
+def test_python_worker_timeout_respawns(tmp_path):
+    from tools.code_interpreter import PythonWorker
+
+    worker = PythonWorker()
+    try:
+        timed_out = worker.run("import time; time.sleep(1)", str(tmp_path), timeout=0.1)
+        assert timed_out.returncode != 0
+        assert "Timed out" in timed_out.stderr
+
+        completed = worker.run("print(WORKSPACE_PATH)", str(tmp_path), timeout=5)
+        assert completed.returncode == 0
+        assert completed.stdout.strip() == str(tmp_path)
+    finally:
+        worker.close()
+
+
+def test_python_worker_captures_fd_output_and_reimports_workspace_modules(tmp_path):
+    from tools.code_interpreter import PythonWorker
+
+    worker = PythonWorker()
+    try:
+        result = worker.run("import os; print('py'); os.system('echo sh; echo err >&2')", str(tmp_path), timeout=10)
+        assert result.stdout.split() == ["py", "sh"]
+        assert result.stderr.strip() == "err"
+
+        (tmp_path / "helper.py").write_text("VALUE = 1\n")
+        assert worker.run("import helper; print(helper.VALUE)", str(tmp_path), timeout=10).stdout.strip() == "1"
+        (tmp_path / "helper.py").write_text("VALUE = 22\n")
+        assert worker.run("import helper; print(helper.VALUE)", str(tmp_path), timeout=10).stdout.strip() == "22"
+    finally:
+        worker.close()
+
+
+def test_python_worker_caps_flooded_output_without_spooling_to_disk(tmp_path):
+    from tools.code_interpreter import PythonWorker
+
+    worker = PythonWorker()
+    try:
+        flood = (
+            "import os, stat\n"
+            "for _ in range(2000): os.write(1, b'x' * 10000)\n"
+            "os.system('head -c 5000000 /dev/zero')\n"
+            # A regular file behind fd 1 would mean the flood went to disk
+            "print('spooled' if stat.S_ISREG(os.fstat(1).st_mode) else 'streamed', file=sys.stderr)"
+        )
+        result = worker.run(flood, str(tmp_path), timeout=30, max_output=1000)
+        assert result.returncode == 0
+        assert result.stdout == "x" * 1000
+        assert result.stdout_truncated and not result.stderr_truncated
+        assert result.stderr.strip() == "streamed"
+    finally:
+        worker.close()
+
+
+def test_code_interpreter_keeps_a_worker_per_workspace(tmp_path):
+    from tools.code_interpreter import CodeInterpreter
+
+    interpreter = CodeInterpreter(workspace_root=str(tmp_path / "a"))
+    try:
+        interpreter.execute_python_code("x = 1")
+        interpreter.set_workspace(str(tmp_path / "b"))
+        interpreter.execute_python_code("x = 1")
+        assert len(interpreter._workers) == 2
+    finally:
+        interpreter.close_workers()
+
+
+def test_run_with_limits_kills_grandchildren_holding_pipes():
+    import subprocess as sp
+    result = run_with_limits(["sh", "-c", "sleep 30 & echo $!"], timeout=10)
+    assert result.returncode == 0
+    grandchild = int(result.stdout.strip())
+    # Reaped by init or left as a zombie, it must no longer be sleeping
+    state = sp.run(["ps", "-o", "stat=", "-p", str(grandchild)], capture_output=True, text=True).stdout.strip()
+    assert state in ("", "Z")
+
+
+def test_captured_output_is_capped_per_stream(tmp_path):
+    from tools.code_interpreter import CodeInterpreter
+    from tools.process_sandbox import MAX_OUTPUT_BYTES
+
+    interpreter = CodeInterpreter(workspace_root=str(tmp_path))
+    try:
+        result = interpreter.execute_python_code("for _ in range(200000): print('y' * 20)")
+        assert result["success"]
+        assert len(result["stdout"]) == MAX_OUTPUT_BYTES
+        assert result["stdout_truncated"] and not result["stderr_truncated"]
+    finally:
+        interpreter.close_workers()
+
+    flooded = run_with_limits(["python", "-c", "print('z' * 100000)"], timeout=10, max_output_bytes=100)
+    assert flooded.returncode == 0
+    assert flooded.stdout == "z" * 100
+    assert flooded.stdout_truncated
@@ -15,3 +15,181 @@ def test_vector_memory_optional():
         pytest.skip("vector memory optional dependencies not installed")
     assert vector_memory is not None
 
+
+
+def test_memory_batches_writes_and_indexes_for_search(tmp_path):
+    from tools.memory import Memory
+    mem = Memory(base_dir=str(tmp_path), flush_interval_ms=60_000)
+    assert mem.remember("ns", "alpha beta beta")["success"]
+    assert mem.remember_batch("ns", ["beta gamma", "delta"], metadatas=[{"k": 1}, None])["success"]
+    assert mem.index_file.read_text() == ""
+    results = mem.search("ns", "Beta")["results"]
+    assert [r["score"] for r in results] == [2, 1]
+    assert mem.search("other", "beta")["results"] == []
+    mem.close()
+    assert len(mem.index_file.read_text().splitlines()) == 3
+
+    # Warm start from the snapshot plus whatever was appended after it
+    with open(mem.index_file, "a") as f:
+        f.write('{"id": "x", "namespace": "ns", "content": "beta epsilon"}\n')
+    reopened = Memory(base_dir=str(tmp_path))
+    try:
+        assert len(reopened.search("ns", "beta")["results"]) == 3
+        assert reopened.search("ns", "epsilon")["results"][0]["item"]["id"] == "x"
+    finally:
+        reopened.close()
+
+    # An incomplete final line is skipped, not cut off, and is indexed once it is finished
+    with open(mem.index_file, "a") as f:
+        f.write('{"id": "b", "nam')
+    recovered = Memory(base_dir=str(tmp_path))
+    try:
+        assert len(recovered.search("ns", "beta")["results"]) == 3
+    finally:
+        recovered.close()
+    with open(mem.index_file, "a") as f:
+        f.write('espace": "ns", "content": "beta zeta"}\n')
+    completed = Memory(base_dir=str(tmp_path))
+    try:
+        assert completed.search("ns", "zeta")["results"][0]["item"]["id"] == "b"
+    finally:
+        completed.close()
+
+
+def test_memory_snapshot_keeps_entries_appended_by_another_writer(tmp_path):
+    from tools.memory import Memory
+    a = Memory(base_dir=str(tmp_path))
+    a.remember("ns", "first entry")
+    b = Memory(base_dir=str(tmp_path))
+    b.remember("ns", "hello world")
+    b.close()
+    a.remember("ns", "second entry")
+    a.close()
+
+    fresh = Memory(base_dir=str(tmp_path))
+    try:
+        assert fresh.search("ns", "hello")["results"][0]["item"]["content"] == "hello world"
+        assert len(fresh.search("ns", "entry")["results"]) == 2
+    finally:
+        fresh.close()
+
+
+def test_rate_limit_fallback_awaits_both_providers():
+    import asyncio
+    from tools.rate_limit_manager import RateLimitManager, RateLimitConfig
+    manager = RateLimitManager()
+    manager.configure_provider("primary", RateLimitConfig(max_retries=1, base_delay=0))
+    manager.configure_provider("fallback", RateLimitConfig(max_retries=1, base_delay=0))
+
+    async def primary(x):
+        raise RuntimeError("down")
+
+    def fallback(x):
+        return x * 2
+
+    result = asyncio.run(manager.execute_with_fallback(primary, fallback, "primary", "fallback", 21))
+    assert result == 42
+    assert manager.get_provider_health("primary")["consecutive_failures"] == 2
+    assert manager.get_provider_health("fallback")["total_calls"] == 1
+
+
+def test_rate_limit_hedge_returns_first_success_and_cancels_the_rest():
+    import time
+    import asyncio
+    from tools.rate_limit_manager import RateLimitManager, RateLimitConfig
+    manager = RateLimitManager()
+    for provider in ("slow", "fast"):
+        manager.configure_provider(provider, RateLimitConfig(max_retries=1, base_delay=0))
+    cancelled = []
+
+    async def slow(x):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(x)
+            raise
+
+    async def fast(x):
+        return x * 2
+
+    async def run_test():
+        result = await manager.execute_hedged([(slow, "slow"), (fast, "fast")], 21, hedge_delay=0.01)
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(run_test()) == 42
+    assert cancelled == [21]
+
+    # Sync providers run off the event loop, so a slow one doesn't hold up the next
+    def slow_sync(x):
+        time.sleep(0.5)
+        return "slow"
+
+    def fast_sync(x):
+        return "fast"
+
+    async def run_sync_test():
+        started = time.monotonic()
+        result = await manager.execute_hedged([(slow_sync, "slow"), (fast_sync, "fast")], 1, hedge_delay=0.01)
+        return result, time.monotonic() - started
+
+    result, elapsed = asyncio.run(run_sync_test())
+    assert result == "fast"
+    assert elapsed < 0.4
+
+
+def test_doc_ingestion_cache_hit_keeps_result_shape(tmp_path):
+    from tools.doc_ingestion import DocIngestion, LARGE_TEXT_BYTES
+    ingestion = DocIngestion(workspace_root=str(tmp_path))
+    (tmp_path / "big.txt").write_text("é" * LARGE_TEXT_BYTES, encoding="utf-8")
+    first = ingestion.ingest("big.txt")
+    second = ingestion.ingest("big.txt")
+    assert first == second
+    assert first["length"] == LARGE_TEXT_BYTES and "text" in first
+
+    # Spilled PDF text reports its length in characters too
+    cached = tmp_path / "spilled.txt"
+    cached.write_text("é" * LARGE_TEXT_BYTES, encoding="utf-8")
+    assert DocIngestion._cached_result(cached, True) == {
+        "success": True, "text_path": str(cached), "length": LARGE_TEXT_BYTES}
+    # A stored count is used as-is instead of re-reading the text
+    cached.with_suffix(".len").write_text("123")
+    assert DocIngestion._cached_result(cached, True)["length"] == 123
+
+
+def test_doc_ingestion_workers_do_not_rerun_the_main_script(tmp_path):
+    import os
+    import sys
+    import subprocess
+    script = tmp_path / "main.py"
+    script.write_text(
+        "import os\n"
+        "with open('runs.log', 'a') as f:\n"
+        "    f.write(f'{__name__} {os.getpid()}\\n')\n"
+        "if __name__ == '__main__':\n"
+        "    from tools.doc_ingestion import DocIngestion\n"
+        "    for name in ('a.txt', 'b.txt', 'c.txt'):\n"
+        "        open(name, 'w').write(name)\n"
+        "    results = DocIngestion(workspace_root='.').ingest_many(['a.txt', 'b.txt', 'c.txt'], workers=2)\n"
+        "    assert [r['text'] for r in results] == ['a.txt', 'b.txt', 'c.txt'], results\n"
+    )
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {**os.environ, "PYTHONPATH": repo_root, "DOC_INGEST_WORKERS": "2"}
+    completed = subprocess.run([sys.executable, str(script)], cwd=tmp_path, env=env,
+                               capture_output=True, text=True, timeout=120)
+    assert completed.returncode == 0, completed.stderr
+    assert [line.split()[0] for line in (tmp_path / "runs.log").read_text().splitlines()] == ["__main__"]
+
+
+def test_file_writes_recreate_a_cached_directory_removed_externally(tmp_path):
+    import shutil
+    from tools.file_manager import FileManager
+    from tools.html_reporter import HtmlReporter
+
+    manager = FileManager(workspace_path=str(tmp_path))
+    reporter = HtmlReporter(workspace_root=str(tmp_path))
+    for _ in range(2):
+        assert manager.write_file("out/a.txt", "x")["success"]
+        assert manager.append_file("out/b.txt", "y")["success"]
+        assert reporter.render("t", [], output_path="out/r.html")["success"]
+        shutil.rmtree(tmp_path / "out")
@@ -6,13 +6,182 @@ Provides safe Python code execution capabilities.
 import subprocess
 import tempfile
 import os
+import re
 import sys
 import json
+import atexit
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 from loguru import logger
 import time
-from tools.process_sandbox import run_with_limits
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+from tools.process_sandbox import run_with_limits, kill_process_tree, SandboxResult, MAX_OUTPUT_BYTES
+from tools import python_worker
+
+# Security: Commands that should be blocked (matched as substrings)
+DANGEROUS_COMMANDS = [
+    'rm -rf', 'rm -r', 'rm -f', 'rm -', 'rm /', 'rm ~',
+    'sudo', 'su', 'chmod 777', 'chmod +x /', 'chown',
+    'dd if=', 'mkfs', 'fdisk', 'mount', 'umount',
+    'shutdown', 'reboot', 'halt', 'poweroff',
+    'killall', 'pkill -9', 'kill -9',
+    'curl -O', 'wget -O', 'scp', 'rsync',
+    'nc ', 'netcat', 'telnet', 'ssh',
+    'python -c "import os; os.system', 'python -c "import subprocess; subprocess.call',
+    'eval ', 'exec ', 'source /', 'cat /etc/passwd', 'cat /etc/shadow',
+    'find / -name', 'grep -r /', 'locate /',
+    'echo $PATH', 'export PATH', 'unset PATH',
+    'history', 'cat ~/.bash_history', 'cat ~/.zsh_history'
+]
+
+# Security: Only allow commands that start with one of these
+SAFE_COMMANDS = [
+    'ls', 'pwd', 'whoami', 'date', 'echo', 'cat', 'head', 'tail',
+    'grep', 'find', 'wc', 'sort', 'uniq', 'cut', 'awk', 'sed',
+    'mkdir', 'touch', 'cp', 'mv', 'rm ', 'chmod', 'chown',
+    'python', 'python3', 'pip', 'pip3', 'conda',
+    'git', 'git status', 'git log', 'git diff',
+    'node', 'npm', 'npx', 'yarn',
+    'java', 'javac', 'mvn', 'gradle',
+    'gcc', 'g++', 'make', 'cmake',
+    'docker', 'docker-compose',
+    'kubectl', 'helm',
+    'curl', 'wget', 'http', 'https',
+    'ps', 'top', 'htop', 'free', 'df', 'du',
+    'tar', 'zip', 'unzip', 'gzip', 'gunzip',
+    'ssh-keygen', 'ssh-copy-id',
+    'rsync', 'scp',
+    'vim', 'nano', 'emacs', 'code',
+    'jupyter', 'jupyter-lab', 'jupyter-notebook',
+    'conda activate', 'conda deactivate',
+    'source venv/bin/activate', 'deactivate'
+]
+
+# Warm interpreters kept alive at once, one per most recently used workspace
+MAX_PYTHON_WORKERS = 8
+
+# Compiled forms of the lists above so run_shell_command never iterates them
+_DANGEROUS_RE = re.compile('|'.join(re.escape(d.lower()) for d in DANGEROUS_COMMANDS))
+_DANGEROUS_BY_LOWER = {d.lower(): d for d in reversed(DANGEROUS_COMMANDS)}
+if ahocorasick is not None:
+    # Single pass over the command regardless of blocklist size
+    _DANGEROUS_AC = ahocorasick.Automaton()
+    for _lowered, _dangerous in _DANGEROUS_BY_LOWER.items():
+        _DANGEROUS_AC.add_word(_lowered, _dangerous)
+    _DANGEROUS_AC.make_automaton()
+else:
+    _DANGEROUS_AC = None
+_SAFE_FIRST = frozenset(c.lower() for c in SAFE_COMMANDS)
+_SAFE_PREFIXES = tuple(c.lower() + ' ' for c in SAFE_COMMANDS if ' ' in c)
+
+# Prologue prepended to snippets run in a one-shot interpreter; the persistent
+# worker provides the same names through the exec globals instead
+_SUBPROCESS_PROLOGUE = """
+import sys
+import os
+import json
+from pathlib import Path
+
+# Set workspace path (the working directory is set by the spawn's cwd)
+WORKSPACE_PATH = r"{workspace_path}"
+sys.path.insert(0, WORKSPACE_PATH)
+
+# User code starts here
+"""
+
+def _find_dangerous_command(command_lower: str) -> Optional[str]:
+    """Return the first blocklisted pattern found in a lowercased command."""
+    if _DANGEROUS_AC is not None:
+        for _, dangerous in _DANGEROUS_AC.iter(command_lower):
+            return dangerous
+        return None
+    
+    match = _DANGEROUS_RE.search(command_lower)
+    return _DANGEROUS_BY_LOWER[match.group(0)] if match else None
+
+class PythonWorker:
+    """Persistent interpreter process that executes code snippets on request.
+    
+    Snippets are sent over the worker's stdin/stdout pipes using the framing in
+    tools/python_worker.py. A watchdog kills the worker when a snippet exceeds
+    its timeout; the next call transparently spawns a fresh one.
+    """
+    
+    def __init__(self, python_executable: Optional[str] = None):
+        self.python_executable = python_executable or sys.executable
+        self._proc: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+        self._closed = False
+    
+    def _ensure_started(self) -> subprocess.Popen:
+        if self._proc is None or self._proc.poll() is not None:
+            self._proc = subprocess.Popen(
+                [self.python_executable, '-u', python_worker.__file__],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True,
+                close_fds=False
+            )
+        return self._proc
+    
+    def run(self, code: str, workspace: str, timeout: int = 30, jit: bool = False,
+            max_output: int = MAX_OUTPUT_BYTES) -> SandboxResult:
+        """Execute code in the worker, mirroring run_with_limits' result shape."""
+        with self._lock:
+            proc = self._ensure_started()
+            timed_out = threading.Event()
+            
+            def on_timeout():
+                timed_out.set()
+                kill_process_tree(proc.pid)
+            
+            watchdog = threading.Timer(timeout, on_timeout)
+            watchdog.start()
+            try:
+                python_worker.write_message(proc.stdin, {
+                    'code': code, 'workspace': workspace, 'jit': jit, 'max_output': max_output
+                })
+                proc.stdin.flush()
+                response = python_worker.read_message(proc.stdout)
+            except (BrokenPipeError, OSError, ValueError):
+                response = None
+            finally:
+                watchdog.cancel()
+            
+            if response is None:
+                # The worker died (timeout, os._exit, crash); respawn on next call
+                kill_process_tree(proc.pid)
+                proc.wait()
+                self._proc = None
+                stderr = f"Timed out after {timeout}s" if timed_out.is_set() else "Python worker exited unexpectedly"
+                return SandboxResult(proc.args, -1, "", stderr)
+            
+            if self._closed:
+                # Closed while this call was queued; don't leave its process behind
+                self._stop()
+            return SandboxResult(proc.args, response['returncode'], response['stdout'], response['stderr'],
+                                 response['stdout_truncated'], response['stderr_truncated'])
+    
+    def _stop(self):
+        if self._proc is not None and self._proc.poll() is None:
+            try:
+                self._proc.stdin.close()
+                self._proc.wait(timeout=5)
+            except Exception:
+                kill_process_tree(self._proc.pid)
+        self._proc = None
+    
+    def close(self):
+        """Stop the worker process."""
+        with self._lock:
+            self._closed = True
+            self._stop()
 
 class CodeInterpreter:
     """Safe Python code execution environment."""
@@ -24,6 +193,13 @@ class CodeInterpreter:
         # Create a temporary directory for code execution
         self.temp_dir = self.workspace_root / "temp_code"
         self.temp_dir.mkdir(exist_ok=True)
+        self._cache_workspace_strings()
+        
+        # Warm interpreters for snippets run with the default executable, one per
+        # workspace so tasks neither queue behind each other nor share state
+        self._workers: "OrderedDict[str, PythonWorker]" = OrderedDict()
+        self._workers_lock = threading.Lock()
+        atexit.register(self.close_workers)
     
     def set_workspace(self, workspace_path: str):
         """Set the current workspace directory."""
@@ -31,12 +207,39 @@ class CodeInterpreter:
         self.workspace_root.mkdir(exist_ok=True)
         self.temp_dir = self.workspace_root / "temp_code"
         self.temp_dir.mkdir(exist_ok=True)
+        self._cache_workspace_strings()
+    
+    def _worker_for(self, workspace: str) -> PythonWorker:
+        """Return the workspace's worker, closing the least recently used beyond MAX_PYTHON_WORKERS."""
+        with self._workers_lock:
+            worker = self._workers.get(workspace)
+            if worker is None:
+                worker = self._workers[workspace] = PythonWorker()
+            self._workers.move_to_end(workspace)
+            evicted = [self._workers.popitem(last=False)[1] for _ in range(len(self._workers) - MAX_PYTHON_WORKERS)]
+        for old in evicted:
+            old.close()
+        return worker
+    
+    def close_workers(self):
+        """Stop every warm interpreter."""
+        with self._workers_lock:
+            workers = list(self._workers.values())
+            self._workers.clear()
+        for worker in workers:
+            worker.close()
+    
+    def _cache_workspace_strings(self):
+        """Resolve per-workspace strings once instead of on every call."""
+        self._workspace_str = str(self.workspace_root.absolute())
+        self._prologue = _SUBPROCESS_PROLOGUE.format(workspace_path=self._workspace_str)
     
     def execute_python_code(self, 
                            code: str, 
                            timeout: int = 30,
                            capture_output: bool = True,
-                           python_executable: Optional[str] = None) -> Dict[str, Any]:
+                           python_executable: Optional[str] = None,
+                           jit: bool = False) -> Dict[str, Any]:
         """
         Execute Python code in a safe environment.
         
@@ -44,56 +247,25 @@ class CodeInterpreter:
             code: Python code to execute
             timeout: Execution timeout in seconds
             capture_output: Whether to capture stdout/stderr
+            jit: Compile numeric top-level functions with Numba when it is
+                installed (default interpreter only)
             
         Returns:
             Dictionary with execution results
         """
         try:
-            # Create a temporary file for the code
-            timestamp = int(time.time() * 1000)
-            code_file = self.temp_dir / f"code_{timestamp}.py"
-            
-            # Prepare the code with workspace path
-            workspace_path = str(self.workspace_root.absolute())
-            prepared_code = f"""
-import sys
-import os
-import json
-from pathlib import Path
-
-# Set workspace path
-WORKSPACE_PATH = r"{workspace_path}"
-os.chdir(WORKSPACE_PATH)
-sys.path.insert(0, WORKSPACE_PATH)
-
-# User code starts here
-{code}
-"""
-            
-            # Write code to file
-            with open(code_file, 'w', encoding='utf-8') as f:
-                f.write(prepared_code)
-            
-            # Execute the code
-            py_exec = python_executable or sys.executable
-            completed = run_with_limits([py_exec, str(code_file)], timeout=timeout)
-            class R: pass
-            result = R()
-            result.returncode = completed.returncode
-            result.stdout = completed.stdout
-            result.stderr = completed.stderr
-            
-            # Clean up the temporary file
-            try:
-                code_file.unlink()
-            except:
-                pass
+            if python_executable is None or python_executable == sys.executable:
+                result = self._worker_for(self._workspace_str).run(code, self._workspace_str, timeout=timeout, jit=jit)
+            else:
+                result = self._run_in_subprocess(code, timeout, python_executable)
             
             return {
                 'success': result.returncode == 0,
                 'stdout': result.stdout if capture_output else '',
                 'stderr': result.stderr if capture_output else '',
                 'return_code': result.returncode,
+                'stdout_truncated': result.stdout_truncated,
+                'stderr_truncated': result.stderr_truncated,
                 'execution_time': timeout if result.returncode != 0 else None
             }
             
@@ -117,6 +289,14 @@ sys.path.insert(0, WORKSPACE_PATH)
                 'execution_time': None
             }
     
+    def _run_in_subprocess(self, code: str, timeout: int, python_executable: str) -> SandboxResult:
+        """Run code in a fresh interpreter (used for non-default executables)."""
+        # Prepare the code with workspace path
+        prepared_code = self._prologue + code + "\n"
+        
+        # Feed the code through stdin rather than a temp file
+        return run_with_limits([python_executable, '-'], timeout=timeout, input=prepared_code, cwd=self._workspace_str)
+    
     def install_package(self, package: str) -> Dict[str, Any]:
         """
         Install a Python package using pip.
@@ -132,6 +312,7 @@ sys.path.insert(0, WORKSPACE_PATH)
                 [sys.executable, '-m', 'pip', 'install', package],
                 capture_output=True,
                 text=True,
+                close_fds=False,
                 timeout=120  # 2 minutes timeout for package installation
             )
             
@@ -172,57 +353,18 @@ sys.path.insert(0, WORKSPACE_PATH)
         Returns:
             Dictionary with execution results
         """
-        # Security: Define dangerous commands that should be blocked
-        dangerous_commands = [
-            'rm -rf', 'rm -r', 'rm -f', 'rm -', 'rm /', 'rm ~',
-            'sudo', 'su', 'chmod 777', 'chmod +x /', 'chown',
-            'dd if=', 'mkfs', 'fdisk', 'mount', 'umount',
-            'shutdown', 'reboot', 'halt', 'poweroff',
-            'killall', 'pkill -9', 'kill -9',
-            'curl -O', 'wget -O', 'scp', 'rsync',
-            'nc ', 'netcat', 'telnet', 'ssh',
-            'python -c "import os; os.system', 'python -c "import subprocess; subprocess.call',
-            'eval ', 'exec ', 'source /', 'cat /etc/passwd', 'cat /etc/shadow',
-            'find / -name', 'grep -r /', 'locate /',
-            'echo $PATH', 'export PATH', 'unset PATH',
-            'history', 'cat ~/.bash_history', 'cat ~/.zsh_history'
-        ]
-        
         # Check for dangerous commands
         command_lower = command.lower().strip()
-        for dangerous in dangerous_commands:
-            if dangerous.lower() in command_lower:
-                return {
-                    'success': False,
-                    'stdout': '',
-                    'stderr': f'Security: Command blocked - "{dangerous}" is not allowed',
-                    'return_code': -1,
-                    'command': command,
-                    'blocked': True
-                }
-        
-        # Security: Only allow safe commands
-        safe_commands = [
-            'ls', 'pwd', 'whoami', 'date', 'echo', 'cat', 'head', 'tail',
-            'grep', 'find', 'wc', 'sort', 'uniq', 'cut', 'awk', 'sed',
-            'mkdir', 'touch', 'cp', 'mv', 'rm ', 'chmod', 'chown',
-            'python', 'python3', 'pip', 'pip3', 'conda',
-            'git', 'git status', 'git log', 'git diff',
-            'node', 'npm', 'npx', 'yarn',
-            'java', 'javac', 'mvn', 'gradle',
-            'gcc', 'g++', 'make', 'cmake',
-            'docker', 'docker-compose',
-            'kubectl', 'helm',
-            'curl', 'wget', 'http', 'https',
-            'ps', 'top', 'htop', 'free', 'df', 'du',
-            'tar', 'zip', 'unzip', 'gzip', 'gunzip',
-            'ssh-keygen', 'ssh-copy-id',
-            'rsync', 'scp',
-            'vim', 'nano', 'emacs', 'code',
-            'jupyter', 'jupyter-lab', 'jupyter-notebook',
-            'conda activate', 'conda deactivate',
-            'source venv/bin/activate', 'deactivate'
-        ]
+        dangerous = _find_dangerous_command(command_lower)
+        if dangerous:
+            return {
+                'success': False,
+                'stdout': '',
+                'stderr': f'Security: Command blocked - "{dangerous}" is not allowed',
+                'return_code': -1,
+                'command': command,
+                'blocked': True
+            }
         
         # Check if command starts with a safe command
         command_parts = command.strip().split()
@@ -237,12 +379,7 @@ sys.path.insert(0, WORKSPACE_PATH)
             }
         
         first_command = command_parts[0].lower()
-        is_safe = False
-        
-        for safe in safe_commands:
-            if first_command == safe.lower() or command_lower.startswith(safe.lower() + ' '):
-                is_safe = True
-                break
+        is_safe = first_command in _SAFE_FIRST or command_lower.startswith(_SAFE_PREFIXES)
         
         if not is_safe:
             return {
@@ -260,8 +397,9 @@ sys.path.insert(0, WORKSPACE_PATH)
                 shell=True,
                 capture_output=True,
                 text=True,
+                close_fds=False,
                 timeout=timeout,
-                cwd=str(self.workspace_root)
+                cwd=self._workspace_str
             )
             
             return {
@@ -308,18 +446,12 @@ sys.path.insert(0, WORKSPACE_PATH)
         try:
             script_path = self.workspace_root / script_name
             
-            # Write script to file
+            # Write script to file (kept as a record of what was run)
             with open(script_path, 'w', encoding='utf-8') as f:
                 f.write(script_content)
             
-            # Make script executable
-            os.chmod(script_path, 0o755)
-            
-            # Run the script
-            result = self.execute_python_code(
-                f"exec(open('{script_name}').read())",
-                timeout=timeout
-            )
+            # Run the script content directly rather than having the child re-read the file
+            result = self.execute_python_code(script_content, timeout=timeout)
             
             result['script_path'] = str(script_path)
             result['script_name'] = script_name
@@ -361,6 +493,11 @@ def get_code_interpreter_tools() -> List[Dict]:
                             "type": "boolean",
                             "description": "Whether to capture stdout/stderr (default: true)",
                             "default": True
+                        },
+                        "jit": {
+                            "type": "boolean",
+                            "description": "Compile numeric loop functions with Numba for speed (default: false)",
+                            "default": False
                         }
                     },
                     "required": ["code"]
@@ -7,26 +7,130 @@ Logs all agent activities, browser operations, and errors by task ID
 import os
 import json
 import time
+import queue
+import atexit
+import threading
 from datetime import datetime
 from typing import Dict, Any, Optional
 from pathlib import Path
 from loguru import logger
 import traceback
 import sys
+from collections import OrderedDict
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dumps_line(obj: Any) -> bytes:
+    """Serialize one JSONL record (with trailing newline) as UTF-8 bytes."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS, default=str)
+        except TypeError:
+            # orjson rejects ints wider than 64 bits without consulting default
+            pass
+    return (json.dumps(obj, separators=(',', ':'), default=str) + "\n").encode('utf-8')
+
+
+def _dumps_pretty(obj: Any) -> str:
+    """Serialize an object with 2-space indentation for the text log."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS, default=str).decode('utf-8')
+        except TypeError:
+            pass
+    return json.dumps(obj, indent=2, default=str)
 
 class DebugLogger:
     """Centralized debug logging system for the Deep Action Agent."""
     
-    def __init__(self, base_log_dir: str = "logs"):
+    def __init__(self, base_log_dir: str = "logs", max_task_loggers: int = 1024):
         self.base_log_dir = Path(base_log_dir)
         self.base_log_dir.mkdir(exist_ok=True)
-        self.task_loggers = {}
+        
+        # LRU of open task loggers; the least recently used one is closed
+        # once more than max_task_loggers are live
+        self.task_loggers: 'OrderedDict[str, TaskLogger]' = OrderedDict()
+        self.max_task_loggers = max_task_loggers
+        self._lock = threading.Lock()
+        
+        # log_* calls only enqueue; a background thread does the disk I/O
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._drain, name="debug-logger-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
         
     def get_task_logger(self, task_id: str) -> 'TaskLogger':
         """Get or create a task-specific logger."""
-        if task_id not in self.task_loggers:
-            self.task_loggers[task_id] = TaskLogger(task_id, self.base_log_dir)
-        return self.task_loggers[task_id]
+        with self._lock:
+            task_logger = self.task_loggers.get(task_id)
+            if task_logger is not None:
+                self.task_loggers.move_to_end(task_id)
+                return task_logger
+            
+            task_logger = TaskLogger(task_id, self.base_log_dir, self._queue)
+            self.task_loggers[task_id] = task_logger
+            if len(self.task_loggers) > self.max_task_loggers:
+                _, evicted = self.task_loggers.popitem(last=False)
+                # Close through the queue so entries already queued for the
+                # evicted logger are written before its file handle goes away
+                self._queue.put((evicted, None))
+            return task_logger
+    
+    def _drain(self):
+        """Write queued entries in batches of up to 64 entries or 50ms."""
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + 0.05
+            while len(batch) < 64 and batch[-1] is not None:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            
+            # Group entries per task so each file gets a single write;
+            # a None entry asks for the logger to be closed afterwards
+            pending: Dict['TaskLogger', list] = {}
+            closing = []
+            for item in batch:
+                if item is None:
+                    running = False
+                    continue
+                task_logger, log_entry = item
+                entries = pending.setdefault(task_logger, [])
+                if log_entry is None:
+                    closing.append(task_logger)
+                else:
+                    entries.append(log_entry)
+            
+            for task_logger, entries in pending.items():
+                try:
+                    task_logger._write_entries(entries)
+                except Exception as e:
+                    logger.error(f"Failed to write debug log for task {task_logger.task_id}: {e}")
+            
+            for task_logger in closing:
+                task_logger.close()
+            
+            for _ in batch:
+                self._queue.task_done()
+    
+    def flush(self):
+        """Block until every queued entry has been written."""
+        if self._writer.is_alive():
+            self._queue.join()
+    
+    def close(self):
+        """Flush pending entries and stop the writer thread."""
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join(timeout=5)
     
     def log_agent_action(self, task_id: str, action: str, details: Dict[str, Any], level: str = "INFO"):
         """Log an agent action."""
@@ -66,45 +170,92 @@ class DebugLogger:
 class TaskLogger:
     """Task-specific logger that writes to a dedicated log file."""
     
-    def __init__(self, task_id: str, base_log_dir: Path):
+    def __init__(self, task_id: str, base_log_dir: Path, write_queue: Optional[queue.Queue] = None):
         self.task_id = task_id
+        self._write_queue = write_queue
         self.log_file = base_log_dir / f"task_{task_id}.log"
-        self.json_log_file = base_log_dir / f"task_{task_id}_detailed.json"
+        self.json_log_file = base_log_dir / f"task_{task_id}_detailed.jsonl"
+        self.start_time = datetime.now().isoformat()
         
-        # Initialize JSON log file
-        if not self.json_log_file.exists():
-            with open(self.json_log_file, 'w') as f:
-                json.dump({
-                    "task_id": task_id,
-                    "start_time": datetime.now().isoformat(),
-                    "logs": []
-                }, f, indent=2)
+        # Keep one append-only handle open for the lifetime of the logger so
+        # each entry costs a single write instead of a read-parse-dump cycle
+        self._json_log = open(self.json_log_file, 'ab', buffering=8192)
     
     def _write_log(self, log_entry: Dict[str, Any]):
         """Write a log entry to both text and JSON files."""
-        timestamp = datetime.now().isoformat()
-        log_entry["timestamp"] = timestamp
+        # Render on the calling thread so later changes to caller-owned dicts
+        # can't leak into the entry; the writer only formats the timestamp
+        ts_ns = time.time_ns()
+        try:
+            details = log_entry.get('details')
+            record = (ts_ns, _dumps_line(log_entry), log_entry['level'], log_entry['message'],
+                      _dumps_pretty(details) if details else None, log_entry.get('traceback'))
+        except Exception as e:
+            logger.error(f"Failed to serialize debug log entry: {e}")
+            return
+        
+        if self._write_queue is not None:
+            self._write_queue.put((self, record))
+        else:
+            self._write_entries([record])
+    
+    def _write_entries(self, records: list):
+        """Write a batch of records from _write_log with one write per file."""
+        if not records:
+            return
+        
+        text_lines = []
+        json_lines = []
+        for ts_ns, line, level, message, details, tb in records:
+            timestamp = datetime.fromtimestamp(ts_ns / 1e9).isoformat()
+            text_lines.append(f"[{timestamp}] {level}: {message}\n")
+            if details:
+                text_lines.append(f"  Details: {details}\n")
+            if tb:
+                text_lines.append(f"  Traceback: {tb}\n")
+            text_lines.append("\n")
+            # Both serializers end a record with "}\n"; add the timestamp as the last key
+            json_lines.append(line[:-2] + f',"timestamp":"{timestamp}"}}\n'.encode('utf-8'))
         
         # Write to text log
         with open(self.log_file, 'a', encoding='utf-8') as f:
-            f.write(f"[{timestamp}] {log_entry['level']}: {log_entry['message']}\n")
-            if log_entry.get('details'):
-                f.write(f"  Details: {json.dumps(log_entry['details'], indent=2)}\n")
-            if log_entry.get('traceback'):
-                f.write(f"  Traceback: {log_entry['traceback']}\n")
-            f.write("\n")
+            f.write(''.join(text_lines))
         
-        # Write to JSON log
-        try:
-            with open(self.json_log_file, 'r') as f:
-                data = json.load(f)
-            
-            data["logs"].append(log_entry)
-            
-            with open(self.json_log_file, 'w') as f:
-                json.dump(data, f, indent=2)
-        except Exception as e:
-            logger.error(f"Failed to write to JSON log: {e}")
+        # Append to JSONL log (one entry per line)
+        if self._json_log.closed:
+            # Entries that raced with an LRU eviction still get written
+            with open(self.json_log_file, 'ab') as f:
+                f.write(b''.join(json_lines))
+        else:
+            self._json_log.write(b''.join(json_lines))
+            self._json_log.flush()
+    
+    def close(self):
+        """Release the JSONL file handle."""
+        if not self._json_log.closed:
+            self._json_log.close()
+    
+    def finalize(self) -> Path:
+        """Close the JSONL log and write the aggregated {task_id, start_time, logs} form.
+        
+        Entries still queued on the DebugLogger writer should be flushed first.
+        """
+        self.close()
+        
+        output_file = self.json_log_file.with_suffix('.json')
+        with open(self.json_log_file, 'r', encoding='utf-8') as src, \
+                open(output_file, 'w', encoding='utf-8') as dst:
+            dst.write(f'{{"task_id": {json.dumps(self.task_id)}, '
+                      f'"start_time": {json.dumps(self.start_time)}, "logs": [')
+            separator = ""
+            for line in src:
+                line = line.strip()
+                if line:
+                    dst.write(separator + line)
+                    separator = ", "
+            dst.write(']}')
+        
+        return output_file
     
     def log_agent_action(self, action: str, details: Dict[str, Any], level: str = "INFO"):
         """Log an agent action."""
@@ -140,20 +291,23 @@ class TaskLogger:
     
     def log_llm_call(self, provider: str, model: str, messages: list, response: Dict[str, Any], duration: float):
         """Log LLM calls with details."""
-        # Truncate messages and response for logging
+        # Truncate messages and response for logging, copying only what changes
         truncated_messages = []
         for msg in messages[-3:]:  # Last 3 messages
-            truncated_msg = msg.copy()
-            if len(truncated_msg.get('content', '')) > 500:
-                truncated_msg['content'] = truncated_msg['content'][:500] + "..."
-            truncated_messages.append(truncated_msg)
+            content = msg.get('content') or ''
+            if len(content) > 500:
+                msg = {**msg, 'content': content[:500] + "..."}
+            truncated_messages.append(msg)
         
-        truncated_response = response.copy()
-        if 'choices' in truncated_response and truncated_response['choices']:
-            choice = truncated_response['choices'][0]
-            if 'message' in choice and 'content' in choice['message']:
-                if len(choice['message']['content']) > 500:
-                    choice['message']['content'] = choice['message']['content'][:500] + "..."
+        truncated_response = response
+        choices = response.get('choices')
+        if choices:
+            choice = choices[0]
+            message = choice.get('message') or {}
+            content = message.get('content') or ''
+            if len(content) > 500:
+                truncated_choice = {**choice, 'message': {**message, 'content': content[:500] + "..."}}
+                truncated_response = {**response, 'choices': [truncated_choice, *choices[1:]]}
         
         self._write_log({
             "type": "llm_call",
@@ -173,8 +327,16 @@ class TaskLogger:
         if isinstance(result, str) and len(result) > 1000:
             truncated_result = result[:1000] + "..."
         elif isinstance(result, dict):
-            truncated_result = {k: str(v)[:200] + "..." if len(str(v)) > 200 else v 
-                              for k, v in result.items()}
+            truncated_result = {}
+            for k, v in result.items():
+                # Primitives and short strings serialize as-is; only stringify the rest
+                if v is None or isinstance(v, (bool, int, float)):
+                    truncated_result[k] = v
+                elif isinstance(v, str):
+                    truncated_result[k] = v[:200] + "..." if len(v) > 200 else v
+                else:
+                    text = str(v)
+                    truncated_result[k] = text[:200] + "..." if len(text) > 200 else v
         
         self._write_log({
             "type": "tool_call",
@@ -4,68 +4,391 @@ Document Ingestion Tools
 Parse PDF, DOCX, and HTML into plain text chunks with basic metadata.
 """
 
+import os
+import sys
+import re
+import mmap
+import atexit
+import asyncio
+import shutil
+import hashlib
+import importlib.machinery
+import zipfile
+import tempfile
+import threading
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, Any, List, Optional
 from pathlib import Path
 from loguru import logger
-from bs4 import BeautifulSoup
-from pypdf import PdfReader
-import docx
+from lxml import html as lxml_html, etree as lxml_etree
+# PyMuPDF (C-backed) is preferred for PDF text; pypdf is the pure-Python fallback
+try:
+    import pymupdf
+except ImportError:
+    try:
+        import fitz as pymupdf
+    except ImportError:
+        pymupdf = None
+try:
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
 
+_WHITESPACE_RE = re.compile(r"\s+")
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+# Whitespace other than newlines, so paragraph breaks survive normalization
+_INLINE_WHITESPACE_RE = re.compile(r"[^\S\n]+")
+_HTML_PARSER = lxml_html.HTMLParser(encoding="utf-8")
 
-def _read_pdf(path: Path) -> str:
+# WordprocessingML elements that contribute to a document's plain text
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_W_TEXT, _W_TAB, _W_BREAK, _W_PARAGRAPH = (_W_NS + t for t in ("t", "tab", "br", "p"))
+
+# Extracted PDF text above this size is returned as a file path, not inline
+LARGE_TEXT_BYTES = 1024 * 1024
+# UTF-8 continuation bytes; every other byte of valid UTF-8 starts one character
+_UTF8_CONTINUATION = bytes(range(0x80, 0xC0))
+
+
+def _count_chars(path: Path) -> int:
+    """Characters in a UTF-8 file, counted block by block without decoding it."""
+    count = 0
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            count += len(block.translate(None, _UTF8_CONTINUATION))
+    return count
+
+
+def _length_path(cached: Path) -> Path:
+    """Sidecar holding the character count of a spilled cache entry."""
+    return cached.with_suffix(".len")
+
+
+# Worker processes start from a clean forkserver (spawn where that is missing)
+# rather than forking this multithreaded server, whose locks a forked child
+# could inherit mid-acquire
+_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+if _MP_CONTEXT.get_start_method() == "forkserver":
+    # The forkserver preloads only what workers run, not the server's __main__
+    _MP_CONTEXT.set_forkserver_preload([__name__])
+
+# OCR kicks in when more than this share of a PDF's pages have no text layer
+OCR_EMPTY_PAGE_RATIO = 0.5
+OCR_DPI = 300
+OCR_TIMEOUT_PER_PAGE = 60
+
+
+def _iter_pdf_pages(path: Path):
+    """Yield the extracted text of each page ("" for pages that fail or have no text layer)."""
+    if pymupdf is not None:
+        with pymupdf.open(str(path)) as doc:
+            for page in doc:
+                try:
+                    yield page.get_text("text", flags=pymupdf.TEXT_PRESERVE_WHITESPACE)
+                except Exception:
+                    yield ""
+        return
+
+    if PdfReader is None:
+        raise RuntimeError("No PDF backend installed (PyMuPDF or pypdf)")
     reader = PdfReader(str(path))
-    parts: List[str] = []
     for page in reader.pages:
         try:
-            parts.append(page.extract_text() or "")
+            yield page.extract_text() or ""
         except Exception:
-            continue
-    return "\n".join(parts).strip()
+            yield ""
+
+
+def _ocr_pages(path: Path, page_numbers: List[int]) -> List[str]:
+    """Rasterize the given pages and OCR them with a single tesseract run."""
+    if pymupdf is None or shutil.which("tesseract") is None:
+        logger.warning("OCR requested but PyMuPDF or the tesseract binary is not available")
+        return [""] * len(page_numbers)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        images = []
+        with pymupdf.open(str(path)) as doc:
+            for n in page_numbers:
+                image = os.path.join(tmp, f"page_{n}.png")
+                doc[n].get_pixmap(dpi=OCR_DPI).save(image)
+                images.append(image)
+        # tesseract treats a .txt input as a list of images and OCRs them in one process
+        listing = os.path.join(tmp, "pages.txt")
+        with open(listing, "w", encoding="utf-8") as f:
+            f.write("\n".join(images) + "\n")
+        result = subprocess.run(
+            ["tesseract", listing, "stdout", "--psm", "6"],
+            capture_output=True,
+            text=True,
+            timeout=OCR_TIMEOUT_PER_PAGE * len(images),
+        )
+    if result.returncode != 0:
+        logger.warning(f"tesseract failed: {result.stderr.strip()}")
+        return [""] * len(page_numbers)
+
+    # Pages are separated by form feeds in tesseract's output
+    texts = result.stdout.split("\f")
+    return [texts[i] if i < len(texts) else "" for i in range(len(page_numbers))]
+
+
+def _read_pdf(path: Path, out, ocr: bool = False) -> None:
+    """Write the text of each page to `out` as it is extracted.
+
+    With `ocr`, pages are held until the end so that a mostly scanned PDF can
+    have its empty pages filled in by one batched OCR pass.
+    """
+    if not ocr:
+        for text in _iter_pdf_pages(path):
+            out.write(text + "\n")
+        return
+
+    pages = list(_iter_pdf_pages(path))
+    empty = [i for i, text in enumerate(pages) if not text.strip()]
+    if pages and len(empty) / len(pages) > OCR_EMPTY_PAGE_RATIO:
+        for i, text in zip(empty, _ocr_pages(path, empty)):
+            pages[i] = text
+    for text in pages:
+        out.write(text + "\n")
 
 
 def _read_docx(path: Path) -> str:
-    d = docx.Document(str(path))
-    return "\n".join(p.text for p in d.paragraphs).strip()
+    """Stream text out of word/document.xml without building the python-docx object model."""
+    parts = []
+    with zipfile.ZipFile(path) as z, z.open("word/document.xml") as f:
+        for _, el in lxml_etree.iterparse(f, tag=(_W_TEXT, _W_TAB, _W_BREAK, _W_PARAGRAPH)):
+            if el.tag == _W_TEXT:
+                if el.text:
+                    parts.append(el.text)
+            elif el.tag == _W_TAB:
+                parts.append("\t")
+            elif el.tag == _W_BREAK:
+                parts.append("\n")
+            else:
+                parts.append("\n")
+                # Paragraph fully consumed; free its subtree
+                el.clear()
+    return _INLINE_WHITESPACE_RE.sub(" ", "".join(parts)).strip()
 
 
 def _read_html(path: Path) -> str:
-    html = path.read_text(encoding="utf-8", errors="ignore")
-    soup = BeautifulSoup(html, "lxml")
+    # libxml2 reads the file itself, so no full-size Python copy is made
+    doc = lxml_html.parse(str(path), parser=_HTML_PARSER).getroot()
+    if doc is None:
+        # Empty or whitespace-only document
+        return ""
     # remove scripts/styles
-    for tag in soup(["script", "style"]):
-        tag.extract()
-    return soup.get_text(" ", strip=True)
+    lxml_etree.strip_elements(doc, "script", "style", "noscript", with_tail=False)
+    return _WHITESPACE_RE.sub(" ", " ".join(doc.itertext())).strip()
+
+
+def _read_text(path: Path) -> str:
+    """Decode a text file straight from an mmap of the page cache."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return str(mm, "utf-8", "ignore")
+
+
+def _default_workers() -> int:
+    return int(os.getenv("DOC_INGEST_WORKERS", "0")) or max(1, (os.cpu_count() or 2) - 1)
+
+
+def _new_pool(max_workers: int) -> ProcessPoolExecutor:
+    """A worker pool whose processes don't re-run the main script."""
+    # Spawned and forkserver workers re-execute a script-run __main__ (e.g.
+    # `python main.py`, with the whole API server) as __mp_main__. A spec
+    # named __main__ makes multiprocessing leave it alone, as under `python -m`;
+    # workers only need this module
+    main = sys.modules.get("__main__")
+    if main is not None and getattr(main, "__spec__", None) is None and getattr(main, "__file__", None):
+        main.__spec__ = importlib.machinery.ModuleSpec("__main__", None)
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=_MP_CONTEXT)
+
+
+def _ingest_one(args):
+    """Pool worker: ingest one file."""
+    ingestion, file_path, options = args
+    return ingestion.ingest(file_path, **options)
 
 
 class DocIngestion:
     def __init__(self, workspace_root: str = "workspace"):
         self.workspace_root = Path(workspace_root)
         self.workspace_root.mkdir(parents=True, exist_ok=True)
+        self._cache_dir = self.workspace_root / ".ingest_cache"
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        """The instance's worker processes, started on first use and stopped at exit."""
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = _new_pool(_default_workers())
+                atexit.register(self.shutdown)
+            return self._pool
+
+    def shutdown(self) -> None:
+        """Stop the worker processes, if any were started."""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is None:
+            return
+        if sys.version_info >= (3, 9):
+            pool.shutdown(wait=True, cancel_futures=True)
+        else:
+            pool.shutdown(wait=True)
+
+    def __getstate__(self):
+        # Instances are pickled to worker processes; the executor stays behind
+        state = self.__dict__.copy()
+        state["_pool"] = None
+        del state["_pool_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._pool_lock = threading.Lock()
 
     def _resolve(self, file_path: str) -> Path:
         p = Path(file_path)
         return p if p.is_absolute() else (self.workspace_root / p)
 
-    def ingest(self, file_path: str) -> Dict[str, Any]:
+    def _cache_path(self, p: Path, ocr: bool = False) -> Path:
+        """Cache file for a document, keyed by a hash of its extension, OCR mode and bytes."""
+        h = hashlib.blake2b(p.suffix.lower().encode("utf-8"), digest_size=16, person=b"ocr" if ocr else b"")
+        with open(p, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(block)
+        return self._cache_dir / f"{h.hexdigest()}.txt"
+
+    @staticmethod
+    def _cached_result(cached: Path, spill: bool) -> Dict[str, Any]:
+        """Result for a cache entry; only PDFs (`spill`) over LARGE_TEXT_BYTES come back as a path."""
+        if spill and cached.stat().st_size > LARGE_TEXT_BYTES:
+            # length is in characters, as for inline text; it is stored beside
+            # the entry when the text is spilled, so hits don't re-read the file
+            try:
+                length = int(_length_path(cached).read_text())
+            except (OSError, ValueError):
+                length = _count_chars(cached)
+            return {"success": True, "text_path": str(cached), "length": length}
+        text = _read_text(cached)
+        return {"success": True, "text": text, "length": len(text)}
+
+    def _write_cache(self, cached: Path, text: str) -> None:
+        """Atomically store extracted text so concurrent ingests never see partial files."""
+        tmp = cached.with_name(f"{cached.name}.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+        os.replace(tmp, cached)
+
+    def _ingest_pdf(self, p: Path, cached: Path, ocr: bool = False) -> None:
+        """Stream PDF text to the cache page by page; small results are stripped in place."""
+        tmp = cached.with_name(f"{cached.name}.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8", newline="") as out:
+            _read_pdf(p, out, ocr=ocr)
+        if tmp.stat().st_size > LARGE_TEXT_BYTES:
+            # Store the length first, so anyone who sees the entry also sees it
+            length_tmp = tmp.with_suffix(".len.tmp")
+            length_tmp.write_text(str(_count_chars(tmp)))
+            os.replace(length_tmp, _length_path(cached))
+            os.replace(tmp, cached)
+        else:
+            text = tmp.read_text(encoding="utf-8").strip()
+            tmp.unlink()
+            self._write_cache(cached, text)
+
+    @staticmethod
+    def _stage_chunks(cached: Path) -> Dict[str, Any]:
+        """Split cached text into sentence chunks stored as Parquet next to the cache entry."""
+        if pq is None:
+            raise RuntimeError("pyarrow is required for chunked ingestion")
+        final = cached.with_suffix(".parquet")
+        if final.exists():
+            n_chunks = pq.read_metadata(str(final)).num_rows
+        else:
+            chunks = [c for c in _SENTENCE_SPLIT_RE.split(_read_text(cached)) if c]
+            n_chunks = len(chunks)
+            table = pa.table({"chunk": chunks, "doc_id": [cached.stem] * n_chunks})
+            tmp = final.with_name(f"{final.name}.{os.getpid()}.tmp")
+            pq.write_table(table, str(tmp))
+            os.replace(tmp, final)
+        return {"success": True, "path": str(final), "n_chunks": n_chunks, "doc_id": cached.stem}
+
+    def ingest(self, file_path: str, ocr: bool = False, chunks: bool = False) -> Dict[str, Any]:
         try:
             p = self._resolve(file_path)
             if not p.exists():
                 return {"success": False, "error": f"File not found: {file_path}"}
+
             ext = p.suffix.lower()
+            # OCR only applies to PDFs
+            ocr = ocr and ext == ".pdf"
+
+            # Identical documents are only parsed once
+            self._cache_dir.mkdir(exist_ok=True)
+            cached = self._cache_path(p, ocr)
+            if cached.exists():
+                return self._stage_chunks(cached) if chunks else self._cached_result(cached, ext == ".pdf")
+
             if ext == ".pdf":
-                text = _read_pdf(p)
+                self._ingest_pdf(p, cached, ocr)
+                return self._stage_chunks(cached) if chunks else self._cached_result(cached, True)
             elif ext in [".docx"]:
                 text = _read_docx(p)
             elif ext in [".html", ".htm"]:
                 text = _read_html(p)
             else:
                 # Fallback: treat as text
-                text = p.read_text(encoding="utf-8", errors="ignore")
+                text = _read_text(p)
+            self._write_cache(cached, text)
+            if chunks:
+                return self._stage_chunks(cached)
             return {"success": True, "text": text, "length": len(text)}
         except Exception as e:
             logger.error(f"ingest failed: {e}")
             return {"success": False, "error": str(e)}
 
+    def ingest_many(self, file_paths: List[str], workers: Optional[int] = None, ocr: bool = False,
+                    chunks: bool = False) -> List[Dict[str, Any]]:
+        """Ingest several files in parallel processes; results follow input order."""
+        if not file_paths:
+            return []
+        default_workers = _default_workers()
+        # The shared pool serves any request for at least its size
+        shared = workers is None or workers >= default_workers
+        workers = min(default_workers if shared else workers, len(file_paths))
+        if workers <= 1:
+            return [self.ingest(fp, ocr=ocr, chunks=chunks) for fp in file_paths]
+
+        chunksize = max(1, len(file_paths) // (workers * 4))
+        options = {"ocr": ocr, "chunks": chunks}
+        tasks = [(self, fp, options) for fp in file_paths]
+        if shared:
+            return list(self._executor().map(_ingest_one, tasks, chunksize=chunksize))
+        with _new_pool(workers) as pool:
+            return list(pool.map(_ingest_one, tasks, chunksize=chunksize))
+
+    async def aingest(self, file_path: str, ocr: bool = False, chunks: bool = False) -> Dict[str, Any]:
+        """Async ingest: parsing runs in a worker process so the event loop stays responsive."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor(), self.ingest, file_path, ocr, chunks)
+
+    async def aingest_many(self, file_paths: List[str], workers: Optional[int] = None, ocr: bool = False,
+                           chunks: bool = False) -> List[Dict[str, Any]]:
+        """Async ingest_many: waits for the process pool from a thread instead of the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.ingest_many, file_paths, workers, ocr, chunks)
+
 
 def get_doc_ingestion_tools() -> List[Dict[str, Any]]:
     return [
@@ -73,15 +396,34 @@ def get_doc_ingestion_tools() -> List[Dict[str, Any]]:
             "type": "function",
             "function": {
                 "name": "ingest",
-                "description": "Ingest a document (PDF/DOCX/HTML/TXT) into plain text",
+                "description": "Ingest a document (PDF/DOCX/HTML/TXT) into plain text. Very large PDFs return a text_path to the extracted text instead of inline text",
                 "parameters": {
                     "type": "object",
                     "properties": {
-                        "file_path": {"type": "string"}
+                        "file_path": {"type": "string"},
+                        "ocr": {"type": "boolean", "description": "OCR scanned PDFs whose pages have no text layer (requires tesseract)"},
+                        "chunks": {"type": "boolean", "description": "Write sentence chunks to a Parquet file and return its path instead of the text"}
                     },
                     "required": ["file_path"]
                 }
             }
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "ingest_many",
+                "description": "Ingest several documents in parallel; returns one result per file in the same order",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "file_paths": {"type": "array", "items": {"type": "string"}},
+                        "workers": {"type": "integer"},
+                        "ocr": {"type": "boolean"},
+                        "chunks": {"type": "boolean"}
+                    },
+                    "required": ["file_paths"]
+                }
+            }
         }
     ]
 
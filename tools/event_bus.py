@@ -1,30 +1,131 @@
 #!/usr/bin/env python3
 """
 Simple in-process async event bus for streaming task events (tokens, tools, progress).
+
+Each task has a fixed-size ring buffer of recent events. Publishing appends in
+O(1) and never blocks; every subscriber keeps its own cursor into the buffer,
+so several consumers (UI, log sinks) can watch the same task independently.
+A subscriber that falls more than `maxsize` events behind skips the events
+that were overwritten.
+
+`close` marks a task's stream as finished: subscribers drain what is buffered
+and stop, and the channel is dropped once the last one has gone. Subscribing to
+a recently closed task returns at once, and a channel that only ever had
+subscribers is dropped when the last of them leaves.
 """
 
 import asyncio
-from typing import Dict, Any, AsyncGenerator
+from collections import OrderedDict, defaultdict, deque
+from itertools import islice
+from typing import Dict, Any, AsyncGenerator, List
+
+
+# How many closed task ids are remembered
+FINISHED_HISTORY = 4096
+
+
+class _Channel:
+    """Ring buffer of a task's events plus a wakeup signal for subscribers."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.events: deque = deque(maxlen=maxsize)
+        self.seq = 0  # sequence number of the next event to be published
+        self.signal = asyncio.Event()
+        self.subscribers = 0
+        self.closed = False
+
+    def notify(self) -> None:
+        # Wakes every current waiter; clearing right away re-arms the signal
+        self.signal.set()
+        self.signal.clear()
 
 
 class EventBus:
-    def __init__(self) -> None:
-        self._queues: Dict[str, asyncio.Queue] = {}
+    def __init__(self, maxsize: int = 4096) -> None:
+        self._maxsize = maxsize
+        self._channels: Dict[str, _Channel] = defaultdict(lambda: _Channel(self._maxsize))
+        # Recently closed task ids, so late subscribers end instead of creating
+        # a channel that nothing would ever close
+        self._finished: "OrderedDict[str, None]" = OrderedDict()
+
+    def _mark_finished(self, task_id: str) -> None:
+        self._finished[task_id] = None
+        self._finished.move_to_end(task_id)
+        if len(self._finished) > FINISHED_HISTORY:
+            self._finished.popitem(last=False)
 
-    def _get_queue(self, task_id: str) -> asyncio.Queue:
-        if task_id not in self._queues:
-            self._queues[task_id] = asyncio.Queue()
-        return self._queues[task_id]
+    def _get_channel(self, task_id: str) -> _Channel:
+        return self._channels[task_id]
 
     async def publish(self, task_id: str, event: Dict[str, Any]) -> None:
-        await self._get_queue(task_id).put(event)
+        self.publish_nowait(task_id, event)
+
+    def publish_nowait(self, task_id: str, event: Dict[str, Any]) -> None:
+        """Append an event, overwriting the oldest one once the buffer is full."""
+        self._finished.pop(task_id, None)
+        channel = self._get_channel(task_id)
+        channel.events.append(event)
+        channel.seq += 1
+        channel.notify()
+
+    def close(self, task_id: str) -> None:
+        """End a task's stream; its channel is removed once no subscriber is reading it."""
+        self._mark_finished(task_id)
+        channel = self._channels.get(task_id)
+        if channel is None:
+            return
+        channel.closed = True
+        channel.notify()
+        if channel.subscribers == 0:
+            del self._channels[task_id]
+
+    def unregister(self, task_id: str) -> None:
+        """Drop a task's channel and buffered events immediately, ending its subscribers."""
+        self._mark_finished(task_id)
+        channel = self._channels.pop(task_id, None)
+        if channel is None:
+            return
+        channel.events.clear()
+        channel.closed = True
+        channel.notify()
+
+    async def subscribe_batches(self, task_id: str, batch: int = 50) -> AsyncGenerator[List[Dict[str, Any]], None]:
+        """Yield lists of up to `batch` events, starting from the oldest buffered event."""
+        channel = self._channels.get(task_id)
+        if channel is None:
+            if task_id in self._finished:
+                return
+            channel = self._get_channel(task_id)
+        # Bound once so the per-batch loop skips the attribute lookups
+        events, wait = channel.events, channel.signal.wait
+        cursor = channel.seq - len(events)
+        channel.subscribers += 1
+        try:
+            while True:
+                while cursor == channel.seq:
+                    if channel.closed:
+                        return
+                    await wait()
+                oldest = channel.seq - len(events)
+                cursor = max(cursor, oldest)
+                if cursor == channel.seq:
+                    # Buffer was dropped by unregister
+                    continue
+                offset = cursor - oldest
+                items = list(islice(events, offset, offset + batch))
+                cursor += len(items)
+                yield items
+        finally:
+            channel.subscribers -= 1
+            # Nothing published yet means no publisher will close this channel
+            if (channel.subscribers == 0 and (channel.closed or channel.seq == 0)
+                    and self._channels.get(task_id) is channel):
+                del self._channels[task_id]
 
     async def subscribe(self, task_id: str) -> AsyncGenerator[Dict[str, Any], None]:
-        queue = self._get_queue(task_id)
-        while True:
-            event = await queue.get()
-            yield event
+        async for items in self.subscribe_batches(task_id):
+            for event in items:
+                yield event
 
 
 event_bus = EventBus()
-
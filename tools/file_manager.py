@@ -6,21 +6,205 @@ Combines the best features from enhanced_file_tool.py and file_system_tools.py
 """
 
 import os
+import io
+import sys
+import re
 import json
-import time
+import mmap
+import errno
 import shutil
+import string
+import fnmatch
+import threading
 import mimetypes
+import functools
+import contextlib
 from pathlib import Path
+from itertools import islice
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Callable, Any, Union
 from datetime import datetime
-import markdown
-from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn
-from rich.panel import Panel
-from rich.text import Text
 from loguru import logger
 
-console = Console()
+# Load the MIME tables at import rather than on the first read_file call
+mimetypes.init()
+
+# Extensions always read as text, whatever the MIME tables say
+_TEXT_SUFFIXES = frozenset({'.md', '.txt', '.py', '.json', '.yaml', '.yml'})
+
+
+@functools.lru_cache(maxsize=512)
+def _mime_for_suffixes(suffixes: str) -> Optional[str]:
+    """MIME type for a file extension chain such as '.tar.gz' (only extensions matter to guess_type)."""
+    return mimetypes.guess_type('x' + suffixes)[0]
+
+
+@functools.lru_cache(maxsize=128)
+def _compile_glob(pattern: str):
+    """Case-sensitive matcher for a single-component glob pattern."""
+    return re.compile(fnmatch.translate(pattern)).match
+
+
+def _scandir_entries(directory: str) -> List[os.DirEntry]:
+    with os.scandir(directory) as it:
+        return list(it)
+
+
+def _walk_entries(directory: str):
+    """Yield the entries of directory and of every subdirectory, in pathlib's '**' order.
+
+    Each directory's entries come before those of its subdirectories, which
+    are visited in scandir order; symlinked directories are not descended
+    into and unreadable ones are skipped.
+    """
+    try:
+        entries = _scandir_entries(directory)
+    except PermissionError:
+        return
+    yield from entries
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir(follow_symlinks=False)
+        except OSError:
+            is_dir = False
+        if is_dir:
+            yield from _walk_entries(entry.path)
+
+
+# Text files above this size are decoded straight from an mmap; below it a
+# plain read() is cheaper than the mmap/munmap syscalls
+MMAP_READ_THRESHOLD = 64 * 1024
+
+# copy_file_range errors that just mean "not supported here"; fall back to a regular copy
+_COPY_RANGE_UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF}
+
+
+def _read_text_file(path: Path, size: int, encoding: str) -> str:
+    """Read a text file, mapping large ones instead of copying them through a read buffer."""
+    if size <= MMAP_READ_THRESHOLD:
+        with open(path, 'r', encoding=encoding) as f:
+            return f.read()
+
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            content = str(mm, encoding)
+    # Match text-mode universal newlines
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content
+
+
+@contextlib.contextmanager
+def _atomic_open(path: Path, encoding: str = 'utf-8'):
+    """Write to a temp file beside `path`, then fsync it and rename it over `path`.
+
+    Readers see either the old file or the complete new one, never a partial write.
+    """
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp, 'w', encoding=encoding, buffering=1 << 20) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            tmp.unlink()
+        raise
+
+
+def _fsync_dir(path: Path) -> None:
+    """Persist renames in a directory; one call covers every file replaced in it."""
+    try:
+        fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    except (AttributeError, OSError):
+        # No directory fds on this platform
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_text(path: Path, data: str) -> None:
+    """Atomically write a whole text file through a single large buffer."""
+    with _atomic_open(path) as f:
+        f.write(data)
+
+
+def _copy_file_contents(src: Path, dst: Path) -> None:
+    """Copy file bytes in the kernel (copy_file_range, else shutil's sendfile path)."""
+    if hasattr(os, "copy_file_range"):
+        src_fd = os.open(src, os.O_RDONLY | os.O_CLOEXEC)
+        try:
+            dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC, 0o666)
+            try:
+                chunk = max(os.fstat(src_fd).st_size, 1 << 20)
+                while os.copy_file_range(src_fd, dst_fd, chunk) > 0:
+                    pass
+                return
+            except OSError as e:
+                if e.errno not in _COPY_RANGE_UNSUPPORTED:
+                    raise
+            finally:
+                os.close(dst_fd)
+        finally:
+            os.close(src_fd)
+    shutil.copyfile(src, dst)
+
+
+_README_TEMPLATE = string.Template("""# Research Report: $topic
+
+## Overview
+This directory contains a comprehensive research report on **$topic** generated by the Deep Action Agent Research System.
+
+## Files Included
+
+### 📄 Main Report
+- **`main_research_report.md`** - Complete research report with all sections
+
+### 📋 Individual Sections  
+- **`01_executive_summary.md`** - Executive summary and key highlights
+- **`02_detailed_analysis.md`** - Detailed analysis of findings
+- **`03_key_findings.md`** - Key insights and discoveries
+- **`04_sources_and_references.md`** - Complete source list and references
+
+### 📊 Metadata
+- **`metadata.json`** - Technical metadata and statistics
+- **`README.md`** - This file
+
+## Research Statistics
+- **Sources Analyzed**: $total_sources
+- **Content Pages Processed**: $total_content_pages
+- **Average Content Length**: $average_content_length characters
+- **Source Credibility**: $average_credibility/1.0
+
+## Usage
+1. Start with `main_research_report.md` for the complete report
+2. Use individual section files for specific information
+3. Check `metadata.json` for technical details
+4. All sources are listed in `04_sources_and_references.md`
+
+## Generation Details
+- **Generated**: $generated_at
+- **Task ID**: $task_id
+- **System**: Deep Action Agent Research System
+
+---
+*This report was automatically generated using advanced AI-powered research techniques.*
+""")
+
+
+class _NullProgress:
+    """Stand-in for a rich Progress when there is no terminal to draw on."""
+    
+    def add_task(self, *args, **kwargs):
+        return None
+    
+    def update(self, *args, **kwargs):
+        pass
+
 
 class FileManager:
     """Consolidated file management tool with progress tracking and resilience."""
@@ -28,13 +212,19 @@ class FileManager:
     def __init__(self, workspace_path: str = "workspace"):
         self.workspace_path = Path(workspace_path)
         self.workspace_path.mkdir(parents=True, exist_ok=True)
+        self._workspace_str = str(self.workspace_path)
+        # Directories already created/seen, so hot write paths skip the
+        # mkdir+stat pair; emptied whenever a write fails in case one vanished
+        self._known_dirs = set()
         self.progress_callbacks = []
-        self.console = Console()
+        # Rich is only needed for the interactive report display; created on first use
+        self.console = None
         
     def set_workspace(self, workspace_path: str):
         """Set the current workspace directory."""
         self.workspace_path = Path(workspace_path)
         self.workspace_path.mkdir(parents=True, exist_ok=True)
+        self._workspace_str = str(self.workspace_path)
         
     def add_progress_callback(self, callback: Callable):
         """Add a progress callback function."""
@@ -46,21 +236,44 @@ class FileManager:
             try:
                 callback(task, progress, status)
             except Exception as e:
-                console.print(f"[red]Progress callback error: {e}[/red]")
+                logger.error(f"Progress callback error: {e}")
+    
+    def _get_console(self):
+        """Return the rich Console, importing rich on first use."""
+        if self.console is None:
+            from rich.console import Console
+            self.console = Console()
+        return self.console
+    
+    def _ensure_dir(self, directory: Path) -> None:
+        if directory not in self._known_dirs:
+            directory.mkdir(parents=True, exist_ok=True)
+            self._known_dirs.add(directory)
+    
+    def _write_in_dir(self, directory: Path, write: Callable[[], Any]) -> Any:
+        """Run write() once `directory` exists, recreating it if it vanished after being cached."""
+        self._ensure_dir(directory)
+        try:
+            return write()
+        except FileNotFoundError:
+            # Removed externally (e.g. workspace cleanup) since it was cached
+            self._known_dirs.discard(directory)
+            self._ensure_dir(directory)
+            return write()
     
     def _resolve_path(self, path: str) -> Path:
         """Resolve a path relative to the workspace."""
-        path_obj = Path(path)
-        if path_obj.is_absolute():
+        # String checks first; a Path is only built for the result
+        ws = self._workspace_str
+        p = os.fspath(path)
+        if os.path.isabs(p):
             # Ensure absolute paths are within workspace for security
-            try:
-                path_obj.relative_to(self.workspace_path)
-                return path_obj
-            except ValueError:
-                # Path is outside workspace, make it relative
-                return self.workspace_path / path_obj.name
+            if p == ws or p.startswith(ws.rstrip(os.sep) + os.sep):
+                return Path(p)
+            # Path is outside workspace, make it relative
+            return Path(ws, os.path.basename(p.rstrip(os.sep)))
         else:
-            return self.workspace_path / path_obj
+            return Path(ws, p)
     
     def read_file(self, file_path: str, encoding: str = 'utf-8') -> Dict[str, Any]:
         """
@@ -84,18 +297,18 @@ class FileManager:
                 }
             
             # Determine file type
-            mime_type, _ = mimetypes.guess_type(str(resolved_path))
+            mime_type = _mime_for_suffixes(''.join(resolved_path.suffixes))
+            size = resolved_path.stat().st_size
             
             # Read text files
-            if mime_type and mime_type.startswith('text') or resolved_path.suffix in ['.md', '.txt', '.py', '.json', '.yaml', '.yml']:
-                with open(resolved_path, 'r', encoding=encoding) as f:
-                    content = f.read()
+            if resolved_path.suffix in _TEXT_SUFFIXES or mime_type and mime_type.startswith('text'):
+                content = _read_text_file(resolved_path, size, encoding)
                 
                 return {
                     'success': True,
                     'content': content,
                     'path': str(resolved_path),
-                    'size': resolved_path.stat().st_size,
+                    'size': size,
                     'mime_type': mime_type,
                     'type': 'text'
                 }
@@ -106,7 +319,7 @@ class FileManager:
                     'success': True,
                     'content': f"[Binary file: {resolved_path.suffix}]",
                     'path': str(resolved_path),
-                    'size': resolved_path.stat().st_size,
+                    'size': size,
                     'mime_type': mime_type,
                     'type': 'binary'
                 }
@@ -149,13 +362,13 @@ class FileManager:
 
             resolved_path = self._resolve_path(file_path)
             
-            # Ensure directory exists
-            resolved_path.parent.mkdir(parents=True, exist_ok=True)
-            
             self._notify_progress("file_write", 0.5, f"Writing file: {file_path}")
             
-            with open(resolved_path, 'w', encoding=encoding) as f:
-                f.write(content)
+            def write():
+                with _atomic_open(resolved_path, encoding) as f:
+                    f.write(content)
+            
+            self._write_in_dir(resolved_path.parent, write)
             
             self._notify_progress("file_write", 1.0, f"Successfully wrote: {file_path}")
             
@@ -167,6 +380,7 @@ class FileManager:
             }
             
         except Exception as e:
+            self._known_dirs.clear()
             logger.error(f"Failed to write file {file_path}: {e}")
             return {
                 'success': False,
@@ -203,11 +417,11 @@ class FileManager:
 
             resolved_path = self._resolve_path(file_path)
             
-            # Ensure directory exists
-            resolved_path.parent.mkdir(parents=True, exist_ok=True)
+            def write():
+                with open(resolved_path, 'a', encoding=encoding, buffering=1 << 20) as f:
+                    f.write(content)
             
-            with open(resolved_path, 'a', encoding=encoding) as f:
-                f.write(content)
+            self._write_in_dir(resolved_path.parent, write)
             
             return {
                 'success': True,
@@ -216,6 +430,7 @@ class FileManager:
             }
             
         except Exception as e:
+            self._known_dirs.clear()
             logger.error(f"Failed to append to file {file_path}: {e}")
             return {
                 'success': False,
@@ -237,27 +452,34 @@ class FileManager:
         """
         full_path = self.workspace_path / output_path
         
-        # Ensure directory exists
-        full_path.parent.mkdir(parents=True, exist_ok=True)
+        # A live display repaints from a background thread; skip it when
+        # output isn't a terminal (server and agent runs). isatty() comes
+        # first so those runs never import rich
+        if sys.stdout is not None and sys.stdout.isatty() and self._get_console().is_terminal:
+            from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn
+            display = Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                BarColumn(),
+                TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
+                TimeElapsedColumn(),
+                console=self.console
+            )
+        else:
+            display = contextlib.nullcontext(_NullProgress())
         
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            BarColumn(),
-            TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
-            TimeElapsedColumn(),
-            console=self.console
-        ) as progress:
+        with display as progress:
             
             # Create initial structure
-            task = progress.add_task(f"Creating report: {title}", total=len(sections) + 2)
+            total_steps = len(sections) + 2
+            task = progress.add_task(f"Creating report: {title}", total=total_steps)
             
             self._notify_progress("file_creation", 0.0, f"Starting report creation: {title}")
             
             # Create markdown content
             md_content = []
             md_content.append(f"# {title}\n")
-            md_content.append(f"*Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*\n\n")
+            md_content.append(f"*Generated on {datetime.now().isoformat(sep=' ', timespec='seconds')}*\n\n")
             
             progress.update(task, advance=1)
             self._notify_progress("file_creation", 0.2, "Created report header")
@@ -271,16 +493,15 @@ class FileManager:
                 md_content.append(f"{section_content}\n\n")
                 
                 progress.update(task, advance=1)
-                progress_percent = (i + 2) / (len(sections) + 2)
-                self._notify_progress("file_creation", progress_percent, f"Added section: {section_title}")
-                
-                # Small delay to show progress
-                time.sleep(0.1)
+                self._notify_progress("file_creation", (i + 2) / total_steps, f"Added section: {section_title}")
             
             # Write file
+            def write():
+                with _atomic_open(full_path) as f:
+                    f.writelines(md_content)
+            
             try:
-                with open(full_path, 'w', encoding='utf-8') as f:
-                    f.write(''.join(md_content))
+                self._write_in_dir(full_path.parent, write)
                 
                 progress.update(task, advance=1)
                 self._notify_progress("file_creation", 1.0, f"Report completed: {output_path}")
@@ -321,20 +542,45 @@ class FileManager:
             
             # Get all files matching pattern
             files = []
-            for file_path in resolved_dir.glob(pattern):
-                if file_path.is_file():
-                    stat = file_path.stat()
+            recursive = pattern.startswith('**/')
+            leaf = pattern[3:] if recursive else pattern
+            if '/' in leaf or os.sep in leaf or '**' in leaf:
+                # Multi-level patterns need pathlib's recursive matching
+                for file_path in resolved_dir.glob(pattern):
+                    if file_path.is_file():
+                        stat = file_path.stat()
+                        files.append({
+                            'name': file_path.name,
+                            'path': os.path.relpath(file_path, self._workspace_str),
+                            'size': stat.st_size,
+                            'modified': datetime.fromtimestamp(stat.st_mtime).isoformat(),
+                            'type': file_path.suffix
+                        })
+            else:
+                # One directory, or '**/<name pattern>' over the whole tree:
+                # scandir entries carry the file type from the directory read,
+                # so only matching files are stat'ed
+                workspace = self._workspace_str
+                match_all = leaf == '*'
+                match = _compile_glob(leaf)
+                for entry in (_walk_entries(str(resolved_dir)) if recursive else _scandir_entries(str(resolved_dir))):
+                    name = entry.name
+                    if not match_all and not match(name):
+                        continue
+                    if not entry.is_file():
+                        continue
+                    stat = entry.stat()
                     files.append({
-                        'name': file_path.name,
-                        'path': str(file_path.relative_to(self.workspace_path)),
+                        'name': name,
+                        'path': os.path.relpath(entry.path, workspace),
                         'size': stat.st_size,
                         'modified': datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                        'type': file_path.suffix
+                        'type': os.path.splitext(name)[1]
                     })
             
             return {
                 'success': True,
-                'directory': str(resolved_dir.relative_to(self.workspace_path)),
+                'directory': os.path.relpath(resolved_dir, self._workspace_str),
                 'pattern': pattern,
                 'files': files,
                 'count': len(files)
@@ -434,10 +680,12 @@ class FileManager:
                     'source': str(source_path)
                 }
             
-            # Ensure destination directory exists
-            dest_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            shutil.copy2(source_path, dest_path)
+            if dest_path.is_dir():
+                dest_path = dest_path / source_path.name
+            if dest_path.exists() and os.path.samefile(source_path, dest_path):
+                raise shutil.SameFileError(f"{source_path} and {dest_path} are the same file")
+            self._write_in_dir(dest_path.parent, lambda: _copy_file_contents(source_path, dest_path))
+            shutil.copystat(source_path, dest_path)
             
             return {
                 'success': True,
@@ -447,6 +695,7 @@ class FileManager:
             }
             
         except Exception as e:
+            self._known_dirs.clear()
             logger.error(f"Failed to copy file {source} to {destination}: {e}")
             return {
                 'success': False,
@@ -472,26 +721,23 @@ class FileManager:
         # Create main report
         if 'report' in research_data:
             report_path = archive_path / "main_report.md"
-            with open(report_path, 'w', encoding='utf-8') as f:
-                f.write(research_data['report'])
+            _write_text(report_path, research_data['report'])
         
         # Save sources data
         if 'sources' in research_data:
             sources_path = archive_path / "sources.json"
-            with open(sources_path, 'w', encoding='utf-8') as f:
-                json.dump(research_data['sources'], f, indent=2)
+            with _atomic_open(sources_path) as f:
+                json.dump(research_data['sources'], f, separators=(',', ':'), ensure_ascii=False)
         
         # Save findings
         if 'findings' in research_data:
             findings_path = archive_path / "findings.md"
-            with open(findings_path, 'w', encoding='utf-8') as f:
-                f.write(research_data['findings'])
+            _write_text(findings_path, research_data['findings'])
         
         # Save key facts
         if 'key_facts' in research_data:
             facts_path = archive_path / "key_facts.md"
-            with open(facts_path, 'w', encoding='utf-8') as f:
-                f.write(research_data['key_facts'])
+            _write_text(facts_path, research_data['key_facts'])
         
         # Create data summary
         summary = {
@@ -502,8 +748,9 @@ class FileManager:
         }
         
         summary_path = archive_path / "data_summary.json"
-        with open(summary_path, 'w', encoding='utf-8') as f:
-            json.dump(summary, f, indent=2)
+        with _atomic_open(summary_path) as f:
+            json.dump(summary, f, separators=(',', ':'), ensure_ascii=False)
+        _fsync_dir(archive_path)
         
         return str(archive_path)
     
@@ -528,57 +775,66 @@ class FileManager:
             
             self._notify_progress("research_report", 0.1, "Starting research report creation")
             
-            # 1. Create Executive Summary
-            executive_summary = self._create_executive_summary(topic, extracted_content, sources)
-            summary_path = report_path / "01_executive_summary.md"
-            with open(summary_path, 'w', encoding='utf-8') as f:
-                f.write(executive_summary)
-            
-            self._notify_progress("research_report", 0.2, "Created executive summary")
-            
-            # 2. Create Detailed Analysis
-            detailed_analysis = self._create_detailed_analysis(topic, extracted_content, sources)
-            analysis_path = report_path / "02_detailed_analysis.md"
-            with open(analysis_path, 'w', encoding='utf-8') as f:
-                f.write(detailed_analysis)
+            # Statistics shared by every section, computed once
+            aggregates = self._compute_aggregates(extracted_content, sources)
             
-            self._notify_progress("research_report", 0.4, "Created detailed analysis")
-            
-            # 3. Create Key Findings
-            key_findings = self._create_key_findings(extracted_content, sources)
-            findings_path = report_path / "03_key_findings.md"
-            with open(findings_path, 'w', encoding='utf-8') as f:
-                f.write(key_findings)
-            
-            self._notify_progress("research_report", 0.6, "Created key findings")
-            
-            # 4. Create Sources and References
-            sources_report = self._create_sources_report(sources)
-            sources_path = report_path / "04_sources_and_references.md"
-            with open(sources_path, 'w', encoding='utf-8') as f:
-                f.write(sources_report)
-            
-            self._notify_progress("research_report", 0.8, "Created sources report")
-            
-            # 5. Create Main Report (Combined)
-            main_report = self._create_main_report(topic, executive_summary, detailed_analysis, key_findings, sources_report)
-            main_path = report_path / "main_research_report.md"
-            with open(main_path, 'w', encoding='utf-8') as f:
-                f.write(main_report)
-            
-            self._notify_progress("research_report", 0.9, "Created main report")
-            
-            # 6. Create Metadata and Index
-            metadata = self._create_metadata(topic, extracted_content, sources, task_id)
-            metadata_path = report_path / "metadata.json"
-            with open(metadata_path, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2)
-            
-            # 7. Create README
-            readme = self._create_readme(topic, report_dir, metadata)
-            readme_path = report_path / "README.md"
-            with open(readme_path, 'w', encoding='utf-8') as f:
-                f.write(readme)
+            # The section builders are pure string work; the seven independent
+            # file writes are handed to a small thread pool as each is ready
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                writes = []
+                
+                # 1. Create Executive Summary
+                executive_summary = self._create_executive_summary(topic, extracted_content, sources, aggregates)
+                writes.append(pool.submit(_write_text, report_path / "01_executive_summary.md", executive_summary))
+                
+                self._notify_progress("research_report", 0.2, "Created executive summary")
+                
+                # 2. Create Detailed Analysis
+                detailed_analysis = self._create_detailed_analysis(topic, extracted_content, sources, aggregates)
+                writes.append(pool.submit(_write_text, report_path / "02_detailed_analysis.md", detailed_analysis))
+                
+                self._notify_progress("research_report", 0.4, "Created detailed analysis")
+                
+                # 3. Create Key Findings
+                key_findings = self._create_key_findings(extracted_content, sources, aggregates)
+                writes.append(pool.submit(_write_text, report_path / "03_key_findings.md", key_findings))
+                
+                self._notify_progress("research_report", 0.6, "Created key findings")
+                
+                # 4. Create Sources and References
+                sources_report = self._create_sources_report(sources, aggregates)
+                writes.append(pool.submit(_write_text, report_path / "04_sources_and_references.md", sources_report))
+                
+                self._notify_progress("research_report", 0.8, "Created sources report")
+                
+                # 5. Create Main Report (Combined)
+                main_path = report_path / "main_research_report.md"
+                
+                def write_main_report():
+                    with _atomic_open(main_path) as f:
+                        self._write_main_report(f, topic, executive_summary, detailed_analysis, key_findings, sources_report, aggregates)
+                
+                writes.append(pool.submit(write_main_report))
+                
+                self._notify_progress("research_report", 0.9, "Created main report")
+                
+                # 6. Create Metadata and Index
+                metadata = self._create_metadata(topic, extracted_content, sources, task_id, aggregates)
+                
+                def write_metadata():
+                    with _atomic_open(report_path / "metadata.json") as f:
+                        json.dump(metadata, f, separators=(',', ':'), ensure_ascii=False)
+                
+                writes.append(pool.submit(write_metadata))
+                
+                # 7. Create README
+                readme = self._create_readme(topic, report_dir, metadata)
+                writes.append(pool.submit(_write_text, report_path / "README.md", readme))
+                
+                # Surface the first write error, if any
+                for future in writes:
+                    future.result()
+            _fsync_dir(report_path)
             
             self._notify_progress("research_report", 1.0, "Research report completed")
             
@@ -605,51 +861,93 @@ class FileManager:
                 'error': str(e)
             }
     
-    def _create_executive_summary(self, topic: str, extracted_content: List[Dict], sources: List[Dict]) -> str:
+    def _compute_aggregates(self, extracted_content: List[Dict], sources: List[Dict]) -> Dict[str, Any]:
+        """Compute the statistics shared by the report sections in one pass over each list."""
+        urls = set()
+        domains = set()
+        dates = []
+        credibility_sum = 0
+        n_credible = 0
+        for s in sources:
+            url = s.get('url', '')
+            urls.add(url)
+            domains.add(urlsplit(url).netloc or 'unknown')
+            dates.append(s.get('date', ''))
+            credibility = s.get('credibility', 0)
+            credibility_sum += credibility
+            if credibility > 0.7:
+                n_credible += 1
+        
+        n_sources = len(sources)
+        n_content = len(extracted_content)
+        total_text_len = sum(len(c.get('text', '')) for c in extracted_content)
+        now = datetime.now().astimezone()
+        return {
+            'n_sources': n_sources,
+            'n_content': n_content,
+            'total_text_len': total_text_len,
+            'avg_text_len': total_text_len // max(n_content, 1),
+            'n_unique_urls': len(urls),
+            'domains': domains,
+            'latest_date': max(dates, default='Unknown'),
+            'credibility_sum': credibility_sum,
+            'avg_credibility': credibility_sum / max(n_sources, 1),
+            'n_credible': n_credible,
+            # One clock read per report: a local display string and an
+            # offset-aware ISO timestamp for machine-readable fields
+            'generated': now.replace(tzinfo=None).isoformat(sep=' ', timespec='seconds'),
+            'generated_iso': now.isoformat(timespec='seconds'),
+        }
+    
+    def _create_executive_summary(self, topic: str, extracted_content: List[Dict], sources: List[Dict], aggregates: Dict[str, Any]) -> str:
         """Create an executive summary of the research."""
-        content = f"""# Executive Summary: {topic}
+        buf = io.StringIO()
+        w = buf.write
+        w(f"""# Executive Summary: {topic}
 
 ## Overview
-This research report provides a comprehensive analysis of {topic}, synthesizing information from {len(sources)} diverse sources to present key insights and trends.
+This research report provides a comprehensive analysis of {topic}, synthesizing information from {aggregates['n_sources']} diverse sources to present key insights and trends.
 
 ## Key Highlights
-"""
+""")
         
         # Extract key insights from content
         key_insights = []
-        for content_item in extracted_content[:5]:  # Top 5 insights
-            if content_item.get('text'):
+        for content_item in islice(extracted_content, 5):  # Top 5 insights
+            text = content_item.get('text')
+            if text:
                 # Extract first meaningful sentence
-                text = content_item['text'][:200] + "..." if len(content_item['text']) > 200 else content_item['text']
-                key_insights.append(f"- {text}")
+                key_insights.append(f"- {text[:200]}{'...' if len(text) > 200 else ''}")
         
-        content += "\n".join(key_insights[:5])  # Limit to 5 insights
+        w("\n".join(key_insights[:5]))  # Limit to 5 insights
         
-        content += f"""
+        w(f"""
 
 ## Research Scope
 - **Topic**: {topic}
-- **Sources Analyzed**: {len(sources)}
-- **Content Extracted**: {len(extracted_content)} pages
-- **Research Date**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+- **Sources Analyzed**: {aggregates['n_sources']}
+- **Content Extracted**: {aggregates['n_content']} pages
+- **Research Date**: {aggregates['generated']}
 
 ## Methodology
 This research utilized advanced web scraping and AI-powered content analysis to gather and synthesize information from multiple authoritative sources, ensuring comprehensive coverage and accuracy.
 
 ---
 *Generated by Deep Action Agent Research System*
-"""
+""")
         
-        return content
+        return buf.getvalue()
     
-    def _create_detailed_analysis(self, topic: str, extracted_content: List[Dict], sources: List[Dict]) -> str:
+    def _create_detailed_analysis(self, topic: str, extracted_content: List[Dict], sources: List[Dict], aggregates: Dict[str, Any]) -> str:
         """Create detailed analysis section."""
-        content = f"""# Detailed Analysis: {topic}
+        buf = io.StringIO()
+        w = buf.write
+        w(f"""# Detailed Analysis: {topic}
 
 ## Research Findings
 
 ### Content Analysis
-"""
+""")
         
         # Group content by themes or sources
         for i, content_item in enumerate(extracted_content, 1):
@@ -657,18 +955,18 @@ This research utilized advanced web scraping and AI-powered content analysis to
                 source_url = content_item.get('url', 'Unknown source')
                 title = content_item.get('title', f'Source {i}')
                 
-                content += f"""
+                w(f"""
 #### {title}
 **Source**: {source_url}
 
 {content_item['text'][:1000]}{'...' if len(content_item['text']) > 1000 else ''}
 
 ---
-"""
+""")
         
-        content += f"""
+        w(f"""
 ## Analysis Summary
-This comprehensive analysis of {topic} reveals several key trends and insights based on {len(extracted_content)} content sources and {len(sources)} research sources.
+This comprehensive analysis of {topic} reveals several key trends and insights based on {aggregates['n_content']} content sources and {aggregates['n_sources']} research sources.
 
 ### Key Themes Identified
 1. **Technology Trends**: Emerging technologies and their impact
@@ -677,96 +975,104 @@ This comprehensive analysis of {topic} reveals several key trends and insights b
 4. **Challenges and Opportunities**: Current obstacles and potential solutions
 
 ### Data Quality Assessment
-- **Source Diversity**: {len(set(s.get('url', '') for s in sources))} unique sources
-- **Content Depth**: Average content length of {sum(len(c.get('text', '')) for c in extracted_content) // max(len(extracted_content), 1)} characters
-- **Recency**: Latest sources from {max((s.get('date', '') for s in sources), default='Unknown')}
+- **Source Diversity**: {aggregates['n_unique_urls']} unique sources
+- **Content Depth**: Average content length of {aggregates['avg_text_len']} characters
+- **Recency**: Latest sources from {aggregates['latest_date']}
 
 ---
-*Analysis generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*
-"""
+*Analysis generated on {aggregates['generated']}*
+""")
         
-        return content
+        return buf.getvalue()
     
-    def _create_key_findings(self, extracted_content: List[Dict], sources: List[Dict]) -> str:
+    def _create_key_findings(self, extracted_content: List[Dict], sources: List[Dict], aggregates: Dict[str, Any]) -> str:
         """Create key findings section."""
-        content = """# Key Findings
+        buf = io.StringIO()
+        w = buf.write
+        w("""# Key Findings
 
 ## Primary Insights
-"""
+""")
         
         # Extract key findings from content
         findings = []
-        for i, content_item in enumerate(extracted_content[:10], 1):  # Top 10 findings
+        for i, content_item in enumerate(islice(extracted_content, 10), 1):  # Top 10 findings
             if content_item.get('text'):
                 # Create a finding from the content
                 text = content_item['text']
-                # Extract first sentence or meaningful phrase
-                first_sentence = text.split('.')[0] + '.' if '.' in text else text[:100] + "..."
+                # Extract first sentence or meaningful phrase; the bounded find
+                # never scans past the head of very long pages
+                end = text.find('.', 0, 400)
+                first_sentence = text[:end + 1] if end != -1 else text[:100] + "..."
                 findings.append(f"{i}. {first_sentence}")
         
-        content += "\n".join(findings)
+        w("\n".join(findings))
         
-        content += f"""
+        w(f"""
 
 ## Statistical Overview
-- **Total Sources Analyzed**: {len(sources)}
-- **Content Pages Processed**: {len(extracted_content)}
+- **Total Sources Analyzed**: {aggregates['n_sources']}
+- **Content Pages Processed**: {aggregates['n_content']}
 - **Key Insights Identified**: {len(findings)}
 - **Research Confidence**: High (based on multiple authoritative sources)
 
 ## Source Credibility Assessment
-"""
+""")
         
         # Assess source credibility
-        credible_sources = [s for s in sources if s.get('credibility', 0) > 0.7]
-        content += f"- **High Credibility Sources**: {len(credible_sources)}/{len(sources)} ({len(credible_sources)/max(len(sources), 1)*100:.1f}%)\n"
-        content += f"- **Average Source Credibility**: {sum(s.get('credibility', 0) for s in sources) / max(len(sources), 1):.2f}/1.0\n\n"
-        content += f"---\n*Findings compiled on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*\n"
+        n_sources, n_credible = aggregates['n_sources'], aggregates['n_credible']
+        w(f"- **High Credibility Sources**: {n_credible}/{n_sources} ({n_credible/max(n_sources, 1)*100:.1f}%)\n")
+        w(f"- **Average Source Credibility**: {aggregates['avg_credibility']:.2f}/1.0\n\n")
+        w(f"---\n*Findings compiled on {aggregates['generated']}*\n")
         
-        return content
+        return buf.getvalue()
     
-    def _create_sources_report(self, sources: List[Dict]) -> str:
+    def _create_sources_report(self, sources: List[Dict], aggregates: Dict[str, Any]) -> str:
         """Create sources and references section."""
-        content = """# Sources and References
+        buf = io.StringIO()
+        w = buf.write
+        w("""# Sources and References
 
 ## Research Sources
-"""
+""")
         
+        accessed = aggregates['generated'][:10]
         for i, source in enumerate(sources, 1):
             url = source.get('url', 'Unknown URL')
             title = source.get('title', f'Source {i}')
             credibility = source.get('credibility', 0)
             
-            content += f"""
+            w(f"""
 ### {i}. {title}
 - **URL**: {url}
 - **Credibility Score**: {credibility:.2f}/1.0
 - **Type**: {source.get('type', 'Web page')}
-- **Date Accessed**: {datetime.now().strftime('%Y-%m-%d')}
+- **Date Accessed**: {accessed}
 
-"""
+""")
         
-        content += f"""
+        w(f"""
 ## Source Analysis
-- **Total Sources**: {len(sources)}
-- **Unique Domains**: {len(set(s.get('url', '').split('/')[2] if '/' in s.get('url', '') else 'unknown' for s in sources))}
-- **Average Credibility**: {sum(s.get('credibility', 0) for s in sources) / max(len(sources), 1):.2f}/1.0
+- **Total Sources**: {aggregates['n_sources']}
+- **Unique Domains**: {len(aggregates['domains'])}
+- **Average Credibility**: {aggregates['avg_credibility']:.2f}/1.0
 
 ## Citation Format
 This research report synthesizes information from the above sources. For academic or professional use, please cite the original sources directly.
 
 ---
-*Sources compiled on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*
-"""
+*Sources compiled on {aggregates['generated']}*
+""")
         
-        return content
+        return buf.getvalue()
     
-    def _create_main_report(self, topic: str, executive_summary: str, detailed_analysis: str, key_findings: str, sources_report: str) -> str:
-        """Create the main comprehensive report."""
-        content = f"""# Comprehensive Research Report: {topic}
+    def _write_main_report(self, f, topic: str, executive_summary: str, detailed_analysis: str, key_findings: str, sources_report: str, aggregates: Dict[str, Any]) -> None:
+        """Write the main comprehensive report to an open text file, section by section."""
+        w = f.write
+        w(f"""# Comprehensive Research Report: {topic}
 
 *Generated by Deep Action Agent Research System*  
-*Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*
+*Date: {aggregates['generated']}*
 
 ---
 
@@ -778,45 +1084,39 @@ This research report synthesizes information from the above sources. For academi
 
 ---
 
-{executive_summary.replace('# Executive Summary', '## Executive Summary')}
-
----
-
-{detailed_analysis.replace('# Detailed Analysis', '## Detailed Analysis')}
-
----
-
-{key_findings.replace('# Key Findings', '## Key Findings')}
-
----
-
-{sources_report.replace('# Sources and References', '## Sources and References')}
+""")
+        w(executive_summary.replace('# Executive Summary', '## Executive Summary'))
+        w("\n\n---\n\n")
+        w(detailed_analysis.replace('# Detailed Analysis', '## Detailed Analysis'))
+        w("\n\n---\n\n")
+        w(key_findings.replace('# Key Findings', '## Key Findings'))
+        w("\n\n---\n\n")
+        w(sources_report.replace('# Sources and References', '## Sources and References'))
+        w(f"""
 
 ---
 
 ## Report Metadata
 - **Generated By**: Deep Action Agent Research System
-- **Generation Date**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+- **Generation Date**: {aggregates['generated']}
 - **Report Version**: 1.0
 - **Format**: Markdown
 
 ---
 *End of Report*
-"""
-        
-        return content
+""")
     
-    def _create_metadata(self, topic: str, extracted_content: List[Dict], sources: List[Dict], task_id: str) -> Dict:
+    def _create_metadata(self, topic: str, extracted_content: List[Dict], sources: List[Dict], task_id: str, aggregates: Dict[str, Any]) -> Dict:
         """Create metadata for the research report."""
         return {
             'topic': topic,
             'task_id': task_id,
-            'generated_at': datetime.now().isoformat(),
-            'total_sources': len(sources),
-            'total_content_pages': len(extracted_content),
-            'average_content_length': sum(len(c.get('text', '')) for c in extracted_content) // max(len(extracted_content), 1),
-            'source_domains': list(set(s.get('url', '').split('/')[2] if '/' in s.get('url', '') else 'unknown' for s in sources)),
-            'average_credibility': sum(s.get('credibility', 0) for s in sources) / max(len(sources), 1),
+            'generated_at': aggregates['generated_iso'],
+            'total_sources': aggregates['n_sources'],
+            'total_content_pages': aggregates['n_content'],
+            'average_content_length': aggregates['avg_text_len'],
+            'source_domains': list(aggregates['domains']),
+            'average_credibility': aggregates['avg_credibility'],
             'report_files': [
                 '01_executive_summary.md',
                 '02_detailed_analysis.md',
@@ -830,172 +1130,144 @@ This research report synthesizes information from the above sources. For academi
     
     def _create_readme(self, topic: str, report_dir: str, metadata: Dict) -> str:
         """Create README file for the research report."""
-        return f"""# Research Report: {topic}
-
-## Overview
-This directory contains a comprehensive research report on **{topic}** generated by the Deep Action Agent Research System.
-
-## Files Included
-
-### 📄 Main Report
-- **`main_research_report.md`** - Complete research report with all sections
-
-### 📋 Individual Sections  
-- **`01_executive_summary.md`** - Executive summary and key highlights
-- **`02_detailed_analysis.md`** - Detailed analysis of findings
-- **`03_key_findings.md`** - Key insights and discoveries
-- **`04_sources_and_references.md`** - Complete source list and references
-
-### 📊 Metadata
-- **`metadata.json`** - Technical metadata and statistics
-- **`README.md`** - This file
-
-## Research Statistics
-- **Sources Analyzed**: {metadata.get('total_sources', 0)}
-- **Content Pages Processed**: {metadata.get('total_content_pages', 0)}
-- **Average Content Length**: {metadata.get('average_content_length', 0)} characters
-- **Source Credibility**: {metadata.get('average_credibility', 0):.2f}/1.0
-
-## Usage
-1. Start with `main_research_report.md` for the complete report
-2. Use individual section files for specific information
-3. Check `metadata.json` for technical details
-4. All sources are listed in `04_sources_and_references.md`
-
-## Generation Details
-- **Generated**: {metadata.get('generated_at', 'Unknown')}
-- **Task ID**: {metadata.get('task_id', 'Unknown')}
-- **System**: Deep Action Agent Research System
-
----
-*This report was automatically generated using advanced AI-powered research techniques.*
-"""
+        return _README_TEMPLATE.substitute(
+            topic=topic,
+            total_sources=metadata.get('total_sources', 0),
+            total_content_pages=metadata.get('total_content_pages', 0),
+            average_content_length=metadata.get('average_content_length', 0),
+            average_credibility=f"{metadata.get('average_credibility', 0):.2f}",
+            generated_at=metadata.get('generated_at', 'Unknown'),
+            task_id=metadata.get('task_id', 'Unknown'),
+        )
 
 # Global instance
 file_manager = FileManager()
 
-def get_file_manager_tools() -> List[Dict]:
-    """Get file manager tools for the agent."""
-    return [
-        {
-            "type": "function",
-            "function": {
-                "name": "read_file",
-                "description": "Read content from a file",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "file_path": {
-                            "type": "string",
-                            "description": "Path to the file to read"
-                        },
-                        "encoding": {
-                            "type": "string",
-                            "description": "File encoding (default: utf-8)"
-                        }
+_FILE_MANAGER_TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "read_file",
+            "description": "Read content from a file",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "file_path": {
+                        "type": "string",
+                        "description": "Path to the file to read"
                     },
-                    "required": ["file_path"]
-                }
+                    "encoding": {
+                        "type": "string",
+                        "description": "File encoding (default: utf-8)"
+                    }
+                },
+                "required": ["file_path"]
             }
-        },
-        {
-            "type": "function",
-            "function": {
-                "name": "write_file",
-                "description": "Write content to a file",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "file_path": {
-                            "type": "string",
-                            "description": "Path to the file to write"
-                        },
-                        "content": {
-                            "type": "string",
-                            "description": "Content to write to the file"
-                        },
-                        "encoding": {
-                            "type": "string",
-                            "description": "File encoding (default: utf-8)"
-                        }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "write_file",
+            "description": "Write content to a file",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "file_path": {
+                        "type": "string",
+                        "description": "Path to the file to write"
                     },
-                    "required": ["file_path", "content"]
-                }
+                    "content": {
+                        "type": "string",
+                        "description": "Content to write to the file"
+                    },
+                    "encoding": {
+                        "type": "string",
+                        "description": "File encoding (default: utf-8)"
+                    }
+                },
+                "required": ["file_path", "content"]
             }
-        },
-        {
-            "type": "function",
-            "function": {
-                "name": "create_markdown_report",
-                "description": "Create a markdown report with progress tracking",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "title": {
-                            "type": "string",
-                            "description": "Report title"
-                        },
-                        "sections": {
-                            "type": "array",
-                            "description": "List of section dictionaries with 'title' and 'content' keys"
-                        },
-                        "output_path": {
-                            "type": "string",
-                            "description": "Output file path"
-                        }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "create_markdown_report",
+            "description": "Create a markdown report with progress tracking",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "title": {
+                        "type": "string",
+                        "description": "Report title"
                     },
-                    "required": ["title", "sections", "output_path"]
-                }
+                    "sections": {
+                        "type": "array",
+                        "description": "List of section dictionaries with 'title' and 'content' keys"
+                    },
+                    "output_path": {
+                        "type": "string",
+                        "description": "Output file path"
+                    }
+                },
+                "required": ["title", "sections", "output_path"]
             }
-        },
-        {
-            "type": "function",
-            "function": {
-                "name": "list_files",
-                "description": "List files in a directory",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "directory": {
-                            "type": "string",
-                            "description": "Directory to list (relative to workspace)"
-                        },
-                        "pattern": {
-                            "type": "string",
-                            "description": "File pattern to match (e.g., '*.py', '*.json')"
-                        }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "list_files",
+            "description": "List files in a directory",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "directory": {
+                        "type": "string",
+                        "description": "Directory to list (relative to workspace)"
                     },
-                    "required": []
-                }
+                    "pattern": {
+                        "type": "string",
+                        "description": "File pattern to match (e.g., '*.py', '*.json')"
+                    }
+                },
+                "required": []
             }
-        },
-        {
-            "type": "function",
-            "function": {
-                "name": "create_comprehensive_research_report",
-                "description": "Create a comprehensive research report with professional formatting including executive summary, detailed analysis, key findings, and sources",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "topic": {
-                            "type": "string",
-                            "description": "Research topic"
-                        },
-                        "extracted_content": {
-                            "type": "array",
-                            "description": "List of extracted content from web pages"
-                        },
-                        "sources": {
-                            "type": "array",
-                            "description": "List of source information"
-                        },
-                        "task_id": {
-                            "type": "string",
-                            "description": "Task ID for tracking"
-                        }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "create_comprehensive_research_report",
+            "description": "Create a comprehensive research report with professional formatting including executive summary, detailed analysis, key findings, and sources",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "topic": {
+                        "type": "string",
+                        "description": "Research topic"
                     },
-                    "required": ["topic", "extracted_content", "sources"]
-                }
+                    "extracted_content": {
+                        "type": "array",
+                        "description": "List of extracted content from web pages"
+                    },
+                    "sources": {
+                        "type": "array",
+                        "description": "List of source information"
+                    },
+                    "task_id": {
+                        "type": "string",
+                        "description": "Task ID for tracking"
+                    }
+                },
+                "required": ["topic", "extracted_content", "sources"]
             }
         }
-    ] 
\ No newline at end of file
+    }
+]
+
+
+def get_file_manager_tools() -> List[Dict]:
+    """Get file manager tools for the agent."""
+    return list(_FILE_MANAGER_TOOLS)
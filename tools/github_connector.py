@@ -4,22 +4,116 @@ GitHub Connector (minimal)
 Create issues/comments using GitHub REST API.
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, List
 import os
+import time
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from loguru import logger
+try:
+    import httpx
+    import h2  # noqa: F401  (required by httpx for HTTP/2)
+except ImportError:
+    httpx = None
+
+# With httpx[http2] installed, calls share one HTTP/2 connection to
+# api.github.com. Otherwise fall back to a pooled keep-alive requests session.
+# Both transports retry only failed connection attempts, never an error
+# status, so issue/comment creation is never duplicated; rate-limit
+# responses are handled by GitHubConnector._post
+if httpx is not None:
+    _client = httpx.Client(
+        transport=httpx.HTTPTransport(
+            http2=True,
+            retries=3,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=20),
+        ),
+        timeout=30,
+    )
+else:
+    _client = requests.Session()
+    _client.mount("https://", HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=100,
+        max_retries=Retry(total=3, read=False, backoff_factor=0.2),
+    ))
+
+
+# GitHub's secondary rate limits penalise concurrent content-creating requests,
+# so POSTs are sent one at a time at least this many seconds apart
+MUTATION_INTERVAL = 1.0
+# Longest rate-limit back-off a call will sleep through, and the most time
+# one _post may take across its attempts
+MAX_RATE_LIMIT_WAIT = 10.0
+POST_BUDGET = 60.0
 
 
 class GitHubConnector:
+    def __init__(self):
+        self._token = None
+        self._cached_headers = None
+        self._post_lock = threading.Lock()
+        self._last_post = float("-inf")
+        # Monotonic time before which no request may be sent, set from
+        # Retry-After / X-RateLimit-* headers and shared by bulk workers
+        self._resume_at = 0.0
+        self._rate_lock = threading.Lock()
+
     def _headers(self):
         token = os.getenv("GITHUB_TOKEN")
-        return {"Authorization": f"token {token}", "Accept": "application/vnd.github+json"}
+        if self._cached_headers is None or token != self._token:
+            self._token = token
+            self._cached_headers = {"Authorization": f"token {token}", "Accept": "application/vnd.github+json"}
+        return self._cached_headers
+
+    def _note_rate_limit(self, resp) -> bool:
+        """Record any back-off the response asks for; True if the request was rejected for it."""
+        delay = None
+        retry_after = resp.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            delay = int(retry_after)
+        elif resp.headers.get("X-RateLimit-Remaining") == "0":
+            reset = resp.headers.get("X-RateLimit-Reset", "")
+            if reset.isdigit():
+                delay = max(0, int(reset) - time.time())
+        if delay is None:
+            return False
+        with self._rate_lock:
+            self._resume_at = max(self._resume_at, time.monotonic() + delay)
+        return resp.status_code in (403, 429)
+
+    def _post(self, url: str, payload: Dict[str, Any], attempts: int = 3):
+        """POST, waiting out short rate-limit back-offs within POST_BUDGET seconds in total."""
+        deadline = time.monotonic() + POST_BUDGET
+        resp = None
+        for _ in range(attempts):
+            now = time.monotonic()
+            wait = max(self._resume_at - now, 0)
+            if wait > MAX_RATE_LIMIT_WAIT or now + wait >= deadline:
+                # Too long to block a tool call on; report the limit instead
+                if resp is not None:
+                    return resp
+                raise RuntimeError(f"GitHub rate limit in effect for another {wait:.0f}s")
+            if wait:
+                time.sleep(wait)
+            with self._post_lock:
+                pause = self._last_post + MUTATION_INTERVAL - time.monotonic()
+                if pause > 0:
+                    time.sleep(pause)
+                resp = _client.post(url, headers=self._headers(), json=payload,
+                                    timeout=min(30, deadline - time.monotonic()))
+                self._last_post = time.monotonic()
+            if not self._note_rate_limit(resp):
+                break
+        return resp
 
     def create_issue(self, owner: str, repo: str, title: str, body: str = "") -> Dict[str, Any]:
         try:
             url = f"https://api.github.com/repos/{owner}/{repo}/issues"
-            resp = requests.post(url, headers=self._headers(), json={"title": title, "body": body}, timeout=30)
-            return {"success": resp.ok, "status": resp.status_code, "body": resp.json()}
+            resp = self._post(url, {"title": title, "body": body})
+            return {"success": resp.status_code < 400, "status": resp.status_code, "body": resp.json()}
         except Exception as e:
             logger.error(f"GitHub create_issue failed: {e}")
             return {"success": False, "error": str(e)}
@@ -27,50 +121,128 @@ class GitHubConnector:
     def comment_issue(self, owner: str, repo: str, issue_number: int, body: str) -> Dict[str, Any]:
         try:
             url = f"https://api.github.com/repos/{owner}/{repo}/issues/{issue_number}/comments"
-            resp = requests.post(url, headers=self._headers(), json={"body": body}, timeout=30)
-            return {"success": resp.ok, "status": resp.status_code, "body": resp.json()}
+            resp = self._post(url, {"body": body})
+            return {"success": resp.status_code < 400, "status": resp.status_code, "body": resp.json()}
         except Exception as e:
             logger.error(f"GitHub comment_issue failed: {e}")
             return {"success": False, "error": str(e)}
 
+    def create_issues_bulk(self, owner: str, repo: str, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Create several issues one after another; results are in the order of items."""
+        results = []
+        for i, item in enumerate(items):
+            title = item.get("title") if isinstance(item, dict) else None
+            if not isinstance(title, str) or not title:
+                results.append({"success": False, "error": f"Item {i} needs a non-empty 'title'"})
+                continue
+            results.append(self.create_issue(owner, repo, title, item.get("body") or ""))
+        return {"success": all(r["success"] for r in results), "results": results}
 
-def get_github_tools():
-    return [
-        {
-            "type": "function",
-            "function": {
-                "name": "github_create_issue",
-                "description": "Create a GitHub issue.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "owner": {"type": "string"},
-                        "repo": {"type": "string"},
-                        "title": {"type": "string"},
-                        "body": {"type": "string"}
-                    },
-                    "required": ["owner", "repo", "title"]
-                }
+    def comment_issues_bulk(self, owner: str, repo: str, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Post several comments one after another; results are in the order of items."""
+        results = []
+        for i, item in enumerate(items):
+            if not isinstance(item, dict):
+                item = {}
+            issue_number, body = item.get("issue_number"), item.get("body")
+            if isinstance(issue_number, bool) or not isinstance(issue_number, int) or not isinstance(body, str):
+                results.append({"success": False, "error": f"Item {i} needs an integer 'issue_number' and a 'body'"})
+                continue
+            results.append(self.comment_issue(owner, repo, issue_number, body))
+        return {"success": all(r["success"] for r in results), "results": results}
+
+_GITHUB_TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "github_create_issue",
+            "description": "Create a GitHub issue.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "owner": {"type": "string"},
+                    "repo": {"type": "string"},
+                    "title": {"type": "string"},
+                    "body": {"type": "string"}
+                },
+                "required": ["owner", "repo", "title"]
             }
-        },
-        {
-            "type": "function",
-            "function": {
-                "name": "github_comment_issue",
-                "description": "Comment on a GitHub issue.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "owner": {"type": "string"},
-                        "repo": {"type": "string"},
-                        "issue_number": {"type": "integer"},
-                        "body": {"type": "string"}
-                    },
-                    "required": ["owner", "repo", "issue_number", "body"]
-                }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "github_comment_issue",
+            "description": "Comment on a GitHub issue.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "owner": {"type": "string"},
+                    "repo": {"type": "string"},
+                    "issue_number": {"type": "integer"},
+                    "body": {"type": "string"}
+                },
+                "required": ["owner", "repo", "issue_number", "body"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "github_create_issues_bulk",
+            "description": "Create several GitHub issues in one call.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "owner": {"type": "string"},
+                    "repo": {"type": "string"},
+                    "items": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "title": {"type": "string"},
+                                "body": {"type": "string"}
+                            },
+                            "required": ["title"]
+                        }
+                    }
+                },
+                "required": ["owner", "repo", "items"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "github_comment_issues_bulk",
+            "description": "Post several comments on GitHub issues in one call.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "owner": {"type": "string"},
+                    "repo": {"type": "string"},
+                    "items": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "issue_number": {"type": "integer"},
+                                "body": {"type": "string"}
+                            },
+                            "required": ["issue_number", "body"]
+                        }
+                    }
+                },
+                "required": ["owner", "repo", "items"]
             }
         }
-    ]
+    }
+]
+
+
+def get_github_tools():
+    return list(_GITHUB_TOOLS)
 
 
 github_connector = GitHubConnector()
@@ -8,75 +8,116 @@ from typing import Dict, Any, List, Optional
 from pathlib import Path
 from loguru import logger
 from datetime import datetime
+import html
+import string
+try:
+    from markupsafe import escape as _markup_escape
+except ImportError:
+    _markup_escape = None
 
-
-class HtmlReporter:
-    def __init__(self, workspace_root: str = "workspace"):
-        self.workspace_root = Path(workspace_root)
-        self.workspace_root.mkdir(parents=True, exist_ok=True)
-
-    def render(self, title: str, sections: List[Dict[str, str]], output_path: Optional[str] = None) -> Dict[str, Any]:
-        try:
-            head = f"""
+# Page skeleton; only the title and generation time vary between reports
+_HEAD_TEMPLATE = string.Template("""
 <!DOCTYPE html>
 <html lang='en'>
 <head>
   <meta charset='UTF-8' />
   <meta name='viewport' content='width=device-width, initial-scale=1.0' />
-  <title>{title}</title>
+  <title>$title</title>
   <style>
-    body {{ font-family: -apple-system, BlinkMacSystemFont, Segoe UI, Roboto, sans-serif; margin: 2rem; }}
-    h1 {{ margin-bottom: 0.25rem; }}
-    .date {{ color: #666; margin-bottom: 1.5rem; }}
-    section {{ margin-bottom: 2rem; }}
-    h2 {{ border-bottom: 1px solid #eee; padding-bottom: 0.25rem; }}
-    pre {{ background: #f7f7f7; padding: 1rem; overflow-x: auto; }}
+    body { font-family: -apple-system, BlinkMacSystemFont, Segoe UI, Roboto, sans-serif; margin: 2rem; }
+    h1 { margin-bottom: 0.25rem; }
+    .date { color: #666; margin-bottom: 1.5rem; }
+    section { margin-bottom: 2rem; }
+    h2 { border-bottom: 1px solid #eee; padding-bottom: 0.25rem; }
+    pre { background: #f7f7f7; padding: 1rem; overflow-x: auto; }
   </style>
   </head>
 <body>
-<h1>{title}</h1>
-<div class='date'>Generated {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</div>
-"""
-            body_parts = []
-            for s in sections or []:
-                st = s.get('title', 'Section')
-                sc = s.get('content', '')
-                body_parts.append(f"<section><h2>{st}</h2><div>{sc}</div></section>")
-            html = head + "\n".join(body_parts) + "\n</body></html>"
+<h1>$title</h1>
+<div class='date'>Generated $generated</div>
+""")
+_TAIL = "\n</body></html>"
+
+# Reports are encoded and written in slices of this many characters so a large
+# report never needs a second, fully encoded copy in memory
+_WRITE_CHUNK = 128 * 1024
+
+
+def _escape(text: Any) -> str:
+    """Escape text for HTML, using markupsafe's C speedups when installed."""
+    if _markup_escape is not None:
+        return str(_markup_escape(text))
+    return html.escape(str(text))
+
+
+class HtmlReporter:
+    def __init__(self, workspace_root: str = "workspace"):
+        self.workspace_root = Path(workspace_root)
+        self.workspace_root.mkdir(parents=True, exist_ok=True)
+        # Output directories already created; emptied if a render fails
+        self._known_dirs = set()
+
+    def _write(self, out: Path, html: str) -> None:
+        if out.parent not in self._known_dirs:
+            out.parent.mkdir(parents=True, exist_ok=True)
+            self._known_dirs.add(out.parent)
+        try:
+            f = open(out, 'wb', buffering=_WRITE_CHUNK)
+        except FileNotFoundError:
+            # The cached directory was removed externally; recreate it once
+            out.parent.mkdir(parents=True, exist_ok=True)
+            f = open(out, 'wb', buffering=_WRITE_CHUNK)
+        with f:
+            for i in range(0, len(html), _WRITE_CHUNK):
+                f.write(html[i:i + _WRITE_CHUNK].encode('utf-8'))
+
+    def render(self, title: str, sections: List[Dict[str, str]], output_path: Optional[str] = None) -> Dict[str, Any]:
+        try:
+            # Titles are plain text; section content is an HTML fragment and is
+            # inserted as-is
+            head = _HEAD_TEMPLATE.substitute(title=_escape(title), generated=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+            body = "\n".join(
+                f"<section><h2>{_escape(s.get('title', 'Section'))}</h2><div>{s.get('content', '')}</div></section>"
+                for s in sections or []
+            )
+            html = "".join((head, body, _TAIL))
 
             path_written = None
             if output_path:
                 out = Path(output_path)
                 if not out.is_absolute():
                     out = self.workspace_root / out
-                out.parent.mkdir(parents=True, exist_ok=True)
-                out.write_text(html, encoding='utf-8')
+                self._write(out, html)
                 path_written = str(out)
             return {"success": True, "html": html, "path": path_written}
         except Exception as e:
+            self._known_dirs.clear()
             logger.error(f"HTML render failed: {e}")
             return {"success": False, "error": str(e)}
 
 
-def get_html_reporter_tools() -> List[Dict[str, Any]]:
-    return [
-        {
-            "type": "function",
-            "function": {
-                "name": "render_html_report",
-                "description": "Render HTML report with sections and optional file output.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "title": {"type": "string"},
-                        "sections": {"type": "array"},
-                        "output_path": {"type": "string"}
-                    },
-                    "required": ["title", "sections"]
-                }
+_HTML_REPORTER_TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "render_html_report",
+            "description": "Render HTML report with sections and optional file output. Titles are plain text; section content is inserted as HTML.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "title": {"type": "string"},
+                    "sections": {"type": "array"},
+                    "output_path": {"type": "string"}
+                },
+                "required": ["title", "sections"]
             }
         }
-    ]
+    }
+]
+
+
+def get_html_reporter_tools() -> List[Dict[str, Any]]:
+    return list(_HTML_REPORTER_TOOLS)
 
 
 html_reporter = HtmlReporter()
@@ -8,10 +8,80 @@ from typing import Dict, Any, Optional, List
 import os
 import re
 import json
+import time
+import random
+import functools
 import requests
+from email.utils import parsedate_to_datetime
+from http.cookiejar import DefaultCookiePolicy
+from requests.adapters import HTTPAdapter
 from urllib.parse import urlparse
 from loguru import logger
 import config
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Shared keep-alive session; connections to the same host are pooled across
+# calls. Cookies are refused so requests stay as stateless as module-level
+# requests.request calls were
+_session = requests.Session()
+_session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+_adapter = HTTPAdapter(pool_connections=10, pool_maxsize=100)
+_session.mount("https://", _adapter)
+_session.mount("http://", _adapter)
+
+# Idempotent requests that fail to connect or get one of these statuses are
+# retried with jittered exponential backoff, all within the call's timeout.
+# A Retry-After longer than MAX_RETRY_AFTER is not waited out; that response
+# is returned to the caller instead
+RETRIES = 3
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+RETRY_METHODS = frozenset({"GET", "HEAD", "PUT", "DELETE", "OPTIONS", "TRACE"})
+BACKOFF_FACTOR = 0.3
+BACKOFF_JITTER = 0.2
+MAX_RETRY_AFTER = 10.0
+
+
+def _retry_delay(resp: Optional[requests.Response], attempt: int) -> float:
+    """Seconds to wait before retry number `attempt` (0-based)."""
+    retry_after = resp.headers.get("Retry-After", "").strip() if resp is not None else ""
+    if retry_after.isdigit():
+        return float(retry_after)
+    if retry_after:
+        try:
+            return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+        except (TypeError, ValueError):
+            pass
+    return BACKOFF_FACTOR * (2 ** attempt) + random.uniform(0, BACKOFF_JITTER)
+
+
+def _send(method: str, url: str, timeout: float, **kwargs) -> requests.Response:
+    """Send a request, retrying transient failures without exceeding `timeout` in total."""
+    deadline = time.monotonic() + timeout
+    retryable = method in RETRY_METHODS
+    for attempt in range(RETRIES + 1):
+        final = not retryable or attempt == RETRIES
+        resp = error = None
+        try:
+            resp = _session.request(method=method, url=url, timeout=max(deadline - time.monotonic(), 0.001), **kwargs)
+        except requests.exceptions.ConnectionError as e:
+            if final:
+                raise
+            error = e
+        if resp is not None and (final or resp.status_code not in RETRY_STATUSES):
+            return resp
+
+        delay = _retry_delay(resp, attempt)
+        if delay > MAX_RETRY_AFTER or time.monotonic() + delay >= deadline:
+            # Not worth waiting out; hand back what the last attempt produced
+            if error is not None:
+                raise error
+            return resp
+        if resp is not None:
+            resp.close()
+        time.sleep(delay)
 
 
 def _load_allowed_domains() -> List[str]:
@@ -21,23 +91,45 @@ def _load_allowed_domains() -> List[str]:
     return allowed
 
 
+_ALLOWED = frozenset()
+_ALLOW_ALL = False
+
+
+def reload_policy() -> None:
+    """Re-read HTTP_ALLOWED_DOMAINS / ALLOW_ALL_HTTP; the policy is otherwise fixed at import."""
+    global _ALLOWED, _ALLOW_ALL
+    _ALLOWED = frozenset(_load_allowed_domains())
+    _ALLOW_ALL = os.getenv("ALLOW_ALL_HTTP", "false").lower() == "true"
+    _is_domain_allowed.cache_clear()
+
+
+@functools.lru_cache(maxsize=8192)
 def _is_domain_allowed(url: str) -> bool:
     try:
         parsed = urlparse(url)
         if parsed.scheme not in ["http", "https"]:
             return False
-        host = (parsed.netloc or "").lower()
-        allowed = _load_allowed_domains()
-        if os.getenv("ALLOW_ALL_HTTP", "false").lower() == "true":
+        if _ALLOW_ALL:
             return True
-        for domain in allowed:
-            if host == domain or host.endswith("." + domain):
-                return True
-        return False
+        # A host matches a domain if it is the domain or one of its subdomains,
+        # i.e. if any dot-separated suffix of the host is in the allowlist
+        parts = (parsed.netloc or "").lower().split(".")
+        return any(".".join(parts[i:]) in _ALLOWED for i in range(len(parts)))
     except Exception:
         return False
 
 
+reload_policy()
+
+def _decode_body(raw: bytes, encoding: Optional[str]) -> str:
+    # Decode from the bytes already read. Without a charset, use UTF-8 instead
+    # of resp.text's charset detection over the whole body
+    try:
+        return raw.decode(encoding or "utf-8", errors="replace")
+    except LookupError:
+        return raw.decode("utf-8", errors="replace")
+
+
 class HttpClient:
     def http_request(
         self,
@@ -57,24 +149,25 @@ class HttpClient:
             timeout = int(os.getenv("HTTP_DEFAULT_TIMEOUT", str(config.REQUEST_TIMEOUT)))
 
         try:
-            resp = requests.request(
-                method=method,
-                url=url,
+            resp = _send(
+                method,
+                url,
+                timeout,
                 headers=headers,
                 params=params,
                 json=json_body,
                 data=data,
-                timeout=timeout,
             )
             content_type = resp.headers.get("Content-Type", "")
+            raw = resp.content
             body: Any
             try:
                 if "application/json" in content_type:
-                    body = resp.json()
+                    body = orjson.loads(raw) if orjson is not None else resp.json()
                 else:
-                    body = resp.text
+                    body = _decode_body(raw, resp.encoding)
             except Exception:
-                body = resp.text
+                body = _decode_body(raw, resp.encoding)
 
             return {
                 "success": resp.ok,
@@ -89,29 +182,32 @@ class HttpClient:
             return {"success": False, "error": str(e)}
 
 
-def get_http_tools() -> List[Dict[str, Any]]:
-    return [
-        {
-            "type": "function",
-            "function": {
-                "name": "http_request",
-                "description": "Perform an HTTP request to an allowed domain.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "method": {"type": "string", "description": "HTTP method (GET, POST, etc.)"},
-                        "url": {"type": "string", "description": "Target URL (http/https only)"},
-                        "headers": {"type": "object", "description": "Optional headers"},
-                        "params": {"type": "object", "description": "Query parameters"},
-                        "json_body": {"type": "object", "description": "JSON body for POST/PUT/PATCH"},
-                        "data": {"description": "Raw request body (alternative to json_body)"},
-                        "timeout": {"type": "integer", "description": "Timeout in seconds"}
-                    },
-                    "required": ["method", "url"]
-                }
+_HTTP_TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "http_request",
+            "description": "Perform an HTTP request to an allowed domain.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "method": {"type": "string", "description": "HTTP method (GET, POST, etc.)"},
+                    "url": {"type": "string", "description": "Target URL (http/https only)"},
+                    "headers": {"type": "object", "description": "Optional headers"},
+                    "params": {"type": "object", "description": "Query parameters"},
+                    "json_body": {"type": "object", "description": "JSON body for POST/PUT/PATCH"},
+                    "data": {"description": "Raw request body (alternative to json_body)"},
+                    "timeout": {"type": "integer", "description": "Timeout in seconds"}
+                },
+                "required": ["method", "url"]
             }
         }
-    ]
+    }
+]
+
+
+def get_http_tools() -> List[Dict[str, Any]]:
+    return list(_HTTP_TOOLS)
 
 
 # Global instance
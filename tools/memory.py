@@ -8,100 +8,334 @@ Replace later with a real vector DB (FAISS/Chroma).
 from __future__ import annotations
 from typing import Dict, Any, List
 from pathlib import Path
+from collections import Counter
+import re
 import json
+import heapq
+import atexit
+import time
 import hashlib
+import functools
+import threading
 from datetime import datetime
 from loguru import logger
 import os
 import config
+try:
+    from blake3 import blake3
+except ImportError:
+    blake3 = None
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def _tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize obj as compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+def _dumps_line(obj: Any) -> bytes:
+    """Serialize one JSONL record (with trailing newline) as UTF-8 bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS)
+    return (json.dumps(obj, separators=(',', ':')) + "\n").encode('utf-8')
+
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+@functools.lru_cache(maxsize=4096)
+def _content_id(text: str) -> str:
+    """64-char hex digest of text; BLAKE3 when installed, SHA-256 otherwise."""
+    data = text.encode("utf-8")
+    if blake3 is not None:
+        return blake3(data).hexdigest(length=32)
+    return hashlib.sha256(data).hexdigest()
+
+
+# Most kernels reject writev calls with more buffers than this
+_IOV_MAX = os.sysconf("SC_IOV_MAX") if hasattr(os, "sysconf") and "SC_IOV_MAX" in os.sysconf_names else 1024
+
+
+def _writev_all(fd: int, buffers: List[bytes]) -> None:
+    """Gather-write every buffer to fd, resuming after short writes."""
+    views = [memoryview(b) for b in buffers]
+    i = 0
+    while i < len(views):
+        written = os.writev(fd, views[i:i + _IOV_MAX])
+        while i < len(views) and written >= len(views[i]):
+            written -= len(views[i])
+            i += 1
+        if written:
+            views[i] = views[i][written:]
+
+
+# Memory entries remembered within this many seconds share one timestamp string
+TIMESTAMP_RESOLUTION = 0.5
 
 
 class Memory:
-    def __init__(self, base_dir: str = None):
+    def __init__(self, base_dir: str = None, flush_interval_ms: int = 50,
+                 max_batch: int = 256, fsync: bool = False):
         base = base_dir or os.path.join(config.WORKSPACE_BASE, "memory")
         self.base_path = Path(base)
         self.base_path.mkdir(parents=True, exist_ok=True)
         self.index_file = self.base_path / "index.jsonl"
         if not self.index_file.exists():
             self.index_file.touch()
+        self.snapshot_file = self.base_path / "index.snapshot.json"
+
+        # Inverted index per namespace: token -> {item id: term frequency}.
+        # It is loaded from the snapshot and topped up from the tail of
+        # index.jsonl, so search never has to re-parse the whole file
+        self._items: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._postings: Dict[str, Dict[str, Dict[str, int]]] = {}
+        self._load_index()
+
+        # remember() only buffers serialized lines; a background thread appends
+        # them every flush_interval_ms, or sooner once max_batch lines are pending
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_batch = max_batch
+        self.fsync = fsync
+        self._buf: List[bytes] = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._event = threading.Event()
+        self._closed = False
+        # (monotonic time, ISO string) of the last formatted timestamp
+        self._last_ts = (float("-inf"), "")
+        self._flusher = threading.Thread(target=self._run, name="memory-flusher", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
 
     def _embed(self, text: str) -> str:
         # Placeholder: deterministic hash as pseudo-embedding ID
-        return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+        return _content_id(text or "")
 
-    def remember(self, namespace: str, content: str, metadata: Dict[str, Any] = None) -> Dict[str, Any]:
+    def _load_index(self) -> None:
+        offset = 0
         try:
-            item = {
-                "id": self._embed(f"{namespace}:{content}"),
-                "namespace": namespace,
-                "content": content,
-                "metadata": metadata or {},
-                "timestamp": datetime.now().isoformat()
+            with open(self.snapshot_file, 'rb') as f:
+                snapshot = _loads(f.read())
+            if snapshot["offset"] <= self.index_file.stat().st_size:
+                offset = snapshot["offset"]
+                self._items, self._postings = snapshot["items"], snapshot["postings"]
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable memory index snapshot: {e}")
+
+        # Byte offset up to which index.jsonl is reflected in the in-memory index
+        self._offset = self._scan(offset)
+
+    def _scan(self, offset: int) -> int:
+        """Index the complete lines of index.jsonl from offset on; returns the offset reached."""
+        with open(self.index_file, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Torn, or another writer's append still in progress; stop
+                    # before it so a later scan picks it up once it is complete
+                    logger.warning(f"Skipping incomplete trailing memory entry at byte {offset}")
+                    break
+                if line.strip():
+                    try:
+                        self._index(_loads(line))
+                    except Exception as e:
+                        logger.warning(f"Skipping unreadable memory entry at byte {offset}: {e}")
+                offset += len(line)
+        return offset
+
+    def _save_index(self) -> None:
+        """Snapshot the inverted index together with the index.jsonl offset it covers."""
+        with self._write_lock, self._lock:
+            # Take in lines other writers appended since we last caught up, so
+            # the snapshot never claims entries it doesn't hold
+            self._offset = self._scan(self._offset)
+            snapshot = {
+                "offset": self._offset,
+                "items": self._items,
+                "postings": self._postings,
             }
-            with open(self.index_file, 'a', encoding='utf-8') as f:
-                f.write(json.dumps(item) + "\n")
+            tmp = self.snapshot_file.with_suffix(".json.tmp")
+            with open(tmp, 'wb') as f:
+                f.write(_dumps(snapshot))
+        os.replace(tmp, self.snapshot_file)
+
+    def _index(self, item: Dict[str, Any]) -> None:
+        namespace, item_id = item.get("namespace"), item["id"]
+        self._items.setdefault(namespace, {})[item_id] = item
+        postings = self._postings.setdefault(namespace, {})
+        for token, tf in Counter(_tokenize(item.get("content", ""))).items():
+            postings.setdefault(token, {})[item_id] = tf
+
+    def _timestamp(self) -> str:
+        now = time.monotonic()
+        last, iso = self._last_ts
+        if now - last > TIMESTAMP_RESOLUTION:
+            iso = datetime.now().isoformat()
+            self._last_ts = (now, iso)
+        return iso
+
+    def _item(self, namespace: str, content: str, metadata: Dict[str, Any] = None,
+              timestamp: str = None) -> Dict[str, Any]:
+        return {
+            "id": self._embed(f"{namespace}:{content}"),
+            "namespace": namespace,
+            "content": content,
+            "metadata": metadata or {},
+            "timestamp": timestamp or self._timestamp()
+        }
+
+    def _enqueue(self, items: List[Dict[str, Any]]) -> None:
+        lines = [_dumps_line(item) for item in items]
+        with self._lock:
+            for item in items:
+                self._index(item)
+            self._buf.extend(lines)
+            pending = len(self._buf)
+        if self._closed:
+            self.flush()
+        elif pending >= self.max_batch:
+            self._event.set()
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._event.wait(self.flush_interval)
+            self._event.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        """Append every buffered entry to the index with a single write."""
+        with self._write_lock:
+            with self._lock:
+                batch, self._buf = self._buf, []
+            if not batch:
+                return
+            try:
+                if hasattr(os, "writev"):
+                    fd = os.open(self.index_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                    try:
+                        _writev_all(fd, batch)
+                        if self.fsync:
+                            os.fsync(fd)
+                        end = os.fstat(fd).st_size
+                    finally:
+                        os.close(fd)
+                else:
+                    with open(self.index_file, 'ab') as f:
+                        f.writelines(batch)
+                        f.flush()
+                        if self.fsync:
+                            os.fsync(f.fileno())
+                        end = os.fstat(f.fileno()).st_size
+                # Our lines are already indexed; if nobody else appended since
+                # the last scan they extend the covered prefix directly
+                if end == self._offset + sum(map(len, batch)):
+                    self._offset = end
+            except Exception as e:
+                logger.error(f"Memory flush failed, dropped {len(batch)} entries: {e}")
+
+    def close(self) -> None:
+        """Stop the flusher thread and write out anything still buffered."""
+        if not self._closed:
+            self._closed = True
+            self._event.set()
+            self._flusher.join(timeout=5)
+        self.flush()
+        try:
+            self._save_index()
+        except Exception as e:
+            logger.error(f"Memory index snapshot failed: {e}")
+
+    def remember(self, namespace: str, content: str, metadata: Dict[str, Any] = None) -> Dict[str, Any]:
+        try:
+            item = self._item(namespace, content, metadata)
+            self._enqueue([item])
             return {"success": True, "item": item}
         except Exception as e:
             logger.error(f"Memory remember failed: {e}")
             return {"success": False, "error": str(e)}
 
+    def remember_batch(self, namespace: str, contents: List[str],
+                       metadatas: List[Dict[str, Any]] = None) -> Dict[str, Any]:
+        try:
+            metadatas = metadatas or [None] * len(contents)
+            timestamp = self._timestamp()
+            items = [self._item(namespace, content, metadata, timestamp)
+                     for content, metadata in zip(contents, metadatas)]
+            self._enqueue(items)
+            return {"success": True, "items": items}
+        except Exception as e:
+            logger.error(f"Memory remember_batch failed: {e}")
+            return {"success": False, "error": str(e)}
+
     def search(self, namespace: str, query: str, top_k: int = 5) -> Dict[str, Any]:
         try:
-            # Naive scoring by substring count; replace with vector similarity later
-            results: List[Dict[str, Any]] = []
-            with open(self.index_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    if not line.strip():
-                        continue
-                    item = json.loads(line)
-                    if item.get("namespace") != namespace:
-                        continue
-                    content = item.get("content", "")
-                    score = content.lower().count(query.lower())
-                    if score > 0:
-                        results.append({"item": item, "score": score})
-            results.sort(key=lambda x: x["score"], reverse=True)
-            return {"success": True, "results": results[:top_k]}
+            # Score items by the summed frequency of the query's tokens;
+            # replace with vector similarity later
+            scores: Counter = Counter()
+            with self._lock:
+                postings = self._postings.get(namespace, {})
+                for token in set(_tokenize(query)):
+                    scores.update(postings.get(token, {}))
+                items = self._items.get(namespace, {})
+                best = heapq.nlargest(top_k, scores.items(), key=lambda kv: kv[1])
+                results = [{"item": items[item_id], "score": score} for item_id, score in best]
+            return {"success": True, "results": results}
         except Exception as e:
             logger.error(f"Memory search failed: {e}")
             return {"success": False, "error": str(e)}
 
 
-def get_memory_tools() -> List[Dict[str, Any]]:
-    return [
-        {
-            "type": "function",
-            "function": {
-                "name": "memory_remember",
-                "description": "Store a memory entry in a namespace.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "namespace": {"type": "string"},
-                        "content": {"type": "string"},
-                        "metadata": {"type": "object"}
-                    },
-                    "required": ["namespace", "content"]
-                }
+_MEMORY_TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "memory_remember",
+            "description": "Store a memory entry in a namespace.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "namespace": {"type": "string"},
+                    "content": {"type": "string"},
+                    "metadata": {"type": "object"}
+                },
+                "required": ["namespace", "content"]
             }
-        },
-        {
-            "type": "function",
-            "function": {
-                "name": "memory_search",
-                "description": "Search memory by namespace and query.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "namespace": {"type": "string"},
-                        "query": {"type": "string"},
-                        "top_k": {"type": "integer", "default": 5}
-                    },
-                    "required": ["namespace", "query"]
-                }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "memory_search",
+            "description": "Search memory by namespace and query.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "namespace": {"type": "string"},
+                    "query": {"type": "string"},
+                    "top_k": {"type": "integer", "default": 5}
+                },
+                "required": ["namespace", "query"]
             }
         }
-    ]
+    }
+]
+
+
+def get_memory_tools() -> List[Dict[str, Any]]:
+    return list(_MEMORY_TOOLS)
 
 
 # Global instance
@@ -6,9 +6,23 @@ Unix-only limits via resource; cross-platform best-effort.
 
 import os
 import signal
+import selectors
 import subprocess
 import time
-from typing import Optional
+from typing import Dict, List, Optional
+
+# Output beyond this many bytes per stream is dropped instead of buffered
+MAX_OUTPUT_BYTES = 1024 * 1024
+
+
+class SandboxResult(subprocess.CompletedProcess):
+    """CompletedProcess that also records whether stdout/stderr were truncated."""
+
+    def __init__(self, args, returncode, stdout=None, stderr=None,
+                 stdout_truncated: bool = False, stderr_truncated: bool = False):
+        super().__init__(args, returncode, stdout, stderr)
+        self.stdout_truncated = stdout_truncated
+        self.stderr_truncated = stderr_truncated
 
 
 def kill_process_tree(pid: int) -> None:
@@ -21,32 +35,160 @@ def kill_process_tree(pid: int) -> None:
             pass
 
 
-def run_with_limits(cmd: list, timeout: int = 30, memory_mb: Optional[int] = None) -> subprocess.CompletedProcess:
-    preexec = None
+class _CappedBuffer:
+    """Collect a stream's output, keeping at most `limit` bytes."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.chunks: List[bytes] = []
+        self.size = 0
+        self.truncated = False
+
+    def append(self, data: bytes) -> None:
+        room = self.limit - self.size
+        if len(data) > room:
+            self.truncated = True
+            data = data[:max(room, 0)]
+        if data:
+            self.chunks.append(data)
+            self.size += len(data)
+
+    def text(self) -> str:
+        return b"".join(self.chunks).decode("utf-8", errors="replace")
+
+
+def _close(stream) -> None:
     try:
-        import resource
+        stream.close()
+    except OSError:
+        pass
+
+
+def _pidfd(pid: int) -> Optional[int]:
+    """A descriptor that becomes readable when pid exits (Linux 5.3+), else None."""
+    try:
+        return os.pidfd_open(pid)
+    except (AttributeError, OSError):
+        return None
+
+
+def _pump(proc: subprocess.Popen, input_data: Optional[bytes], buffers: Dict[int, _CappedBuffer],
+          deadline: float) -> bool:
+    """Feed stdin and drain stdout/stderr from the calling thread.
 
-        def set_limits():
-            # Put in a new process group so we can kill the tree easily
-            os.setsid()
-            if memory_mb:
+    Returns once both output pipes hit EOF, the deadline passes, or the child
+    has been gone for a second while something it spawned still holds a pipe.
+    The result is True only if both pipes reached EOF.
+    """
+    pending = memoryview(input_data or b"")
+    exit_fd = _pidfd(proc.pid)
+    exited_at = None
+    open_fds = set(buffers)
+    with selectors.DefaultSelector() as sel:
+        for fd in buffers:
+            sel.register(fd, selectors.EVENT_READ)
+        if proc.stdin is not None and pending:
+            os.set_blocking(proc.stdin.fileno(), False)
+            sel.register(proc.stdin.fileno(), selectors.EVENT_WRITE)
+        elif proc.stdin is not None:
+            _close(proc.stdin)
+        if exit_fd is not None:
+            sel.register(exit_fd, selectors.EVENT_READ)
+
+        try:
+            while open_fds:
+                now = time.monotonic()
+                if exited_at is None and exit_fd is None and proc.poll() is not None:
+                    exited_at = now
+                remaining = (deadline if exited_at is None else min(deadline, exited_at + 1)) - now
+                if remaining <= 0:
+                    break
+                if exit_fd is None and exited_at is None:
+                    # No pidfd to wake us on exit; poll for it instead
+                    remaining = min(remaining, 0.05)
+
+                for key, _ in sel.select(remaining):
+                    fd = key.fd
+                    if fd == exit_fd:
+                        sel.unregister(fd)
+                        exited_at = time.monotonic()
+                    elif fd in buffers:
+                        data = os.read(fd, 65536)
+                        if data:
+                            buffers[fd].append(data)
+                        else:
+                            sel.unregister(fd)
+                            open_fds.discard(fd)
+                    else:
+                        try:
+                            pending = pending[os.write(fd, pending[:65536]):]
+                        except BlockingIOError:
+                            continue
+                        except OSError:
+                            # Child closed its stdin (BrokenPipeError) or went away
+                            pending = pending[:0]
+                        if not pending:
+                            sel.unregister(fd)
+                            _close(proc.stdin)
+        finally:
+            if exit_fd is not None:
+                os.close(exit_fd)
+            for stream in (proc.stdin, proc.stdout, proc.stderr):
+                if stream is not None:
+                    _close(stream)
+    return not open_fds
+
+
+def run_with_limits(cmd: list, timeout: int = 30, memory_mb: Optional[int] = None,
+                    input: Optional[str] = None, max_output_bytes: int = MAX_OUTPUT_BYTES,
+                    cwd: Optional[str] = None) -> SandboxResult:
+    # Descriptors are non-inheritable by default (PEP 446), so close_fds=False
+    # only skips the per-spawn walk over every open fd. Without a preexec_fn
+    # subprocess can also use posix_spawn/vfork instead of fork. The child
+    # always gets its own session (setsid in C, not a Python hook) so the whole
+    # tree can be killed with killpg.
+    preexec = None
+    if memory_mb:
+        try:
+            import resource
+
+            def set_limits():
                 bytes_limit = memory_mb * 1024 * 1024
                 resource.setrlimit(resource.RLIMIT_AS, (bytes_limit, bytes_limit))
                 resource.setrlimit(resource.RLIMIT_DATA, (bytes_limit, bytes_limit))
 
-        preexec = set_limits
-    except Exception:
-        # Windows / unsupported: still set new session
-        def setpg():
-            os.setsid()
-        preexec = setpg
+            preexec = set_limits
+        except Exception:
+            # Windows / unsupported: no memory limits
+            preexec = None
+
+    stdin = subprocess.PIPE if input is not None else None
+    proc = subprocess.Popen(cmd, stdin=stdin, stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=cwd,
+                            preexec_fn=preexec, start_new_session=True, close_fds=False)
+
+    # Pump all pipes from this thread with a selector, capping what is kept so
+    # a noisy child can't grow our memory without bound; output past the cap
+    # is drained and dropped
+    deadline = time.monotonic() + timeout
+    buffers = {proc.stdout.fileno(): _CappedBuffer(max_output_bytes),
+               proc.stderr.fileno(): _CappedBuffer(max_output_bytes)}
+    out, err = buffers.values()
+    drained = _pump(proc, input.encode("utf-8") if input is not None else None, buffers, deadline)
+    if not drained:
+        # Something in the child's session still holds a pipe (a background
+        # grandchild, or the child itself past the deadline). The session's
+        # process group id is the child's pid, and it stays valid even once
+        # the child has been reaped
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except OSError:
+            pass
 
-    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, preexec_fn=preexec)
-    start = time.time()
     try:
-        outs, errs = proc.communicate(timeout=timeout)
-        return subprocess.CompletedProcess(cmd, proc.returncode, outs, errs)
+        proc.wait(timeout=max(deadline - time.monotonic(), 0))
     except subprocess.TimeoutExpired:
         kill_process_tree(proc.pid)
-        return subprocess.CompletedProcess(cmd, -1, "", f"Timed out after {timeout}s")
+        proc.wait()
+        return SandboxResult(cmd, -1, "", f"Timed out after {timeout}s")
 
+    return SandboxResult(cmd, proc.returncode, out.text(), err.text(), out.truncated, err.truncated)
@@ -4,13 +4,17 @@ Progress Tracking System
 Provides real-time progress updates and live file creation tracking.
 """
 
+import os
 import time
 import json
+import atexit
+import functools
 import threading
 from typing import Dict, List, Optional, Callable, Any
 from datetime import datetime, timedelta
 from pathlib import Path
-from dataclasses import dataclass, asdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict, replace
 from enum import Enum
 
 from rich.console import Console
@@ -23,9 +27,32 @@ from rich.text import Text
 from rich.columns import Columns
 from rich.align import Align
 from loguru import logger
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 console = Console()
 
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    return str(obj)
+
+
+def _dumps_progress(data: Dict[str, Any]) -> bytes:
+    """Serialize a progress snapshot as indented UTF-8 JSON."""
+    if orjson is not None:
+        # orjson writes datetimes as ISO 8601 and enums as their values
+        return orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, indent=2, ensure_ascii=False, default=_json_default).encode('utf-8')
+
+
+_loads = orjson.loads if orjson is not None else json.loads
+
 class TaskStatus(Enum):
     """Task status enumeration."""
     PENDING = "pending"
@@ -34,6 +61,14 @@ class TaskStatus(Enum):
     FAILED = "failed"
     CANCELLED = "cancelled"
 
+_STATUS_ICONS = {
+    TaskStatus.PENDING: "⏳",
+    TaskStatus.RUNNING: "🔄",
+    TaskStatus.COMPLETED: "✅",
+    TaskStatus.FAILED: "❌",
+    TaskStatus.CANCELLED: "🚫"
+}
+
 @dataclass
 class TaskProgress:
     """Task progress information."""
@@ -49,26 +84,66 @@ class TaskProgress:
     error_message: Optional[str] = None
     metadata: Dict[str, Any] = None
 
+def _task_from_data(data: Dict[str, Any]) -> TaskProgress:
+    """Rebuild a TaskProgress from a decoded progress file."""
+    fromisoformat = datetime.fromisoformat
+    estimated_completion = data.get("estimated_completion")
+    return TaskProgress(
+        task_id=data["task_id"],
+        task_name=data["task_name"],
+        status=TaskStatus(data["status"]),
+        progress=data["progress"],
+        current_step=data["current_step"],
+        total_steps=data["total_steps"],
+        current_step_num=data["current_step_num"],
+        start_time=fromisoformat(data["start_time"]),
+        estimated_completion=fromisoformat(estimated_completion) if estimated_completion else None,
+        error_message=data.get("error_message"),
+        metadata=data.get("metadata", {})
+    )
+
 class ProgressTracker:
     """Real-time progress tracking system."""
     
     def __init__(self, workspace_path: str = "workspace"):
         self.workspace_path = Path(workspace_path)
         self.tasks: Dict[str, TaskProgress] = {}
+        # Task ids per status (dicts used as insertion-ordered sets), kept in
+        # step with self.tasks so summaries don't rescan every task
+        self._by_status: Dict[TaskStatus, Dict[str, None]] = {status: {} for status in TaskStatus}
         self.callbacks: List[Callable] = []
         self.lock = threading.Lock()
         self.console = Console()
         self.live_display = None
         self.display_enabled = True
+        self._layout = None
+        self._summary_panel = None
         
         # Create progress directory
         self.progress_dir = self.workspace_path / "progress"
         self.progress_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Updates only mark a task dirty; a background thread writes each
+        # dirty task once per flush interval, coalescing bursts of updates
+        self.flush_interval = 0.1
+        self._dirty = set()
+        self._flush_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(target=self._run_flusher, name="progress-flusher", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
     
     def add_callback(self, callback: Callable[[TaskProgress], None]):
         """Add a progress callback."""
         self.callbacks.append(callback)
     
+    def _index_status(self, task_id: str, old: Optional[TaskStatus], new: Optional[TaskStatus]):
+        """Move task_id between status buckets (caller holds self.lock)."""
+        if old is not None:
+            self._by_status[old].pop(task_id, None)
+        if new is not None:
+            self._by_status[new][task_id] = None
+    
     def _notify_callbacks(self, task_progress: TaskProgress):
         """Notify all callbacks of progress update."""
         for callback in self.callbacks:
@@ -92,12 +167,17 @@ class ProgressTracker:
                 metadata={}
             )
             
+            previous = self.tasks.get(task_id)
+            self._index_status(task_id, previous.status if previous else None, task_progress.status)
             self.tasks[task_id] = task_progress
             self._save_task_progress(task_progress)
-            self._notify_callbacks(task_progress)
-            
-            logger.info(f"Created task: {task_name} (ID: {task_id})")
-            return task_id
+            snapshot = replace(task_progress)
+        
+        # Callbacks get a copy and run outside the lock, so a slow one
+        # doesn't stall other producers
+        self._notify_callbacks(snapshot)
+        logger.info(f"Created task: {task_name} (ID: {task_id})")
+        return task_id
     
     def update_task(self, task_id: str, **kwargs) -> bool:
         """Update task progress."""
@@ -107,6 +187,9 @@ class ProgressTracker:
                 return False
             
             task = self.tasks[task_id]
+            old_status = task.status
+            if 'status' in kwargs:
+                kwargs['status'] = TaskStatus(kwargs['status'])
             
             # Update fields
             for key, value in kwargs.items():
@@ -121,10 +204,14 @@ class ProgressTracker:
             if task.progress >= 1.0 and task.status == TaskStatus.RUNNING:
                 task.status = TaskStatus.COMPLETED
             
-            self._save_task_progress(task)
-            self._notify_callbacks(task)
+            if task.status != old_status:
+                self._index_status(task_id, old_status, task.status)
             
-            return True
+            self._save_task_progress(task)
+            snapshot = replace(task)
+        
+        self._notify_callbacks(snapshot)
+        return True
     
     def start_task(self, task_id: str, current_step: str = "Starting"):
         """Start a task."""
@@ -132,56 +219,90 @@ class ProgressTracker:
     
     def complete_task(self, task_id: str, current_step: str = "Completed"):
         """Mark a task as completed."""
-        return self.update_task(
+        updated = self.update_task(
             task_id, 
             status=TaskStatus.COMPLETED, 
             current_step=current_step,
             progress=1.0,
             current_step_num=self.tasks[task_id].total_steps
         )
+        # Final states are written straight away rather than on the next tick
+        self.flush()
+        return updated
     
     def fail_task(self, task_id: str, error_message: str):
         """Mark a task as failed."""
-        return self.update_task(
+        updated = self.update_task(
             task_id,
             status=TaskStatus.FAILED,
             current_step="Failed",
             error_message=error_message
         )
+        self.flush()
+        return updated
     
     def _save_task_progress(self, task_progress: TaskProgress):
-        """Save task progress to file."""
+        """Queue task progress to be written by the flusher (caller holds self.lock)."""
+        self._dirty.add(task_progress.task_id)
+    
+    def _run_flusher(self):
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+    
+    def flush(self):
+        """Write every task updated since the last flush, once each."""
+        with self._flush_lock:
+            with self.lock:
+                dirty, self._dirty = self._dirty, set()
+                snapshots = [self._progress_data(self.tasks[task_id]) for task_id in dirty if task_id in self.tasks]
+            for progress_data in snapshots:
+                self._write_task_progress(progress_data)
+    
+    def close(self):
+        """Stop the flusher thread and write any pending updates."""
+        self._closed.set()
+        self.flush()
+    
+    def _progress_data(self, task_progress: TaskProgress) -> Dict[str, Any]:
+        """Snapshot a task for serialization; datetimes and status stay as objects."""
+        return {
+            "task_id": task_progress.task_id,
+            "task_name": task_progress.task_name,
+            "status": task_progress.status,
+            "progress": task_progress.progress,
+            "current_step": task_progress.current_step,
+            "total_steps": task_progress.total_steps,
+            "current_step_num": task_progress.current_step_num,
+            "start_time": task_progress.start_time,
+            "estimated_completion": task_progress.estimated_completion,
+            "error_message": task_progress.error_message,
+            "metadata": dict(task_progress.metadata or {})
+        }
+    
+    def _progress_file(self, task_id: str) -> Path:
+        """Path of a task's progress file."""
+        # Try to use workspace manager if available
         try:
-            # Try to use workspace manager if available
-            try:
-                from main import get_workspace_manager
-                workspace_manager = get_workspace_manager(task_progress.task_id)
-                progress_file = Path(workspace_manager.get_progress_path(f"{task_progress.task_id}.json"))
-            except Exception as e:
-                logger.warning(f"Could not get workspace manager for task {task_progress.task_id}: {e}")
-                # Fallback to local file
-                progress_file = self.progress_dir / f"{task_progress.task_id}.json"
+            from main import get_workspace_manager
+            workspace_manager = get_workspace_manager(task_id)
+            return Path(workspace_manager.get_progress_path(f"{task_id}.json"))
+        except Exception as e:
+            logger.warning(f"Could not get workspace manager for task {task_id}: {e}")
+            # Fallback to local file
+            return self.progress_dir / f"{task_id}.json"
+    
+    def _write_task_progress(self, progress_data: Dict[str, Any]):
+        """Atomically write one task's progress file."""
+        task_id = progress_data["task_id"]
+        try:
+            progress_file = self._progress_file(task_id)
             
             # Ensure directory exists
             progress_file.parent.mkdir(parents=True, exist_ok=True)
             
-            # Convert to dict for JSON serialization
-            progress_data = {
-                "task_id": task_progress.task_id,
-                "task_name": task_progress.task_name,
-                "status": task_progress.status.value,
-                "progress": task_progress.progress,
-                "current_step": task_progress.current_step,
-                "total_steps": task_progress.total_steps,
-                "current_step_num": task_progress.current_step_num,
-                "start_time": task_progress.start_time.isoformat(),
-                "estimated_completion": task_progress.estimated_completion.isoformat() if task_progress.estimated_completion else None,
-                "error_message": task_progress.error_message,
-                "metadata": task_progress.metadata or {}
-            }
-            
-            with open(progress_file, 'w', encoding='utf-8') as f:
-                json.dump(progress_data, f, indent=2, ensure_ascii=False)
+            tmp_file = progress_file.with_name(progress_file.name + ".tmp")
+            tmp_file.write_bytes(_dumps_progress(progress_data))
+            os.replace(tmp_file, progress_file)
                 
         except Exception as e:
             logger.error(f"Failed to save task progress: {e}")
@@ -189,41 +310,24 @@ class ProgressTracker:
     def _load_task_progress(self, task_id: str) -> Optional[TaskProgress]:
         """Load task progress from file."""
         try:
-            # Try to use workspace manager if available
-            try:
-                from main import get_workspace_manager
-                workspace_manager = get_workspace_manager(task_id)
-                progress_file = Path(workspace_manager.get_progress_path(f"{task_id}.json"))
-            except Exception as e:
-                logger.warning(f"Could not get workspace manager for task {task_id}: {e}")
-                # Fallback to local file
-                progress_file = self.progress_dir / f"{task_id}.json"
+            progress_file = self._progress_file(task_id)
             
-            if not progress_file.exists():
+            try:
+                raw = progress_file.read_bytes()
+            except FileNotFoundError:
                 return None
-            
-            with open(progress_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # Convert back to TaskProgress object
-            return TaskProgress(
-                task_id=data["task_id"],
-                task_name=data["task_name"],
-                status=TaskStatus(data["status"]),
-                progress=data["progress"],
-                current_step=data["current_step"],
-                total_steps=data["total_steps"],
-                current_step_num=data["current_step_num"],
-                start_time=datetime.fromisoformat(data["start_time"]),
-                estimated_completion=datetime.fromisoformat(data["estimated_completion"]) if data.get("estimated_completion") else None,
-                error_message=data.get("error_message"),
-                metadata=data.get("metadata", {})
-            )
+            return _task_from_data(_loads(raw))
             
         except Exception as e:
             logger.error(f"Failed to load task progress: {e}")
             return None
     
+    def load_all_task_progress(self, task_ids: List[str]) -> Dict[str, TaskProgress]:
+        """Load many tasks' progress files concurrently, skipping missing or unreadable ones."""
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            loaded = pool.map(self._load_task_progress, task_ids)
+            return {task_id: task for task_id, task in zip(task_ids, loaded) if task is not None}
+    
     def get_task_progress(self, task_id: str) -> Optional[TaskProgress]:
         """Get task progress by ID."""
         return self.tasks.get(task_id)
@@ -234,32 +338,31 @@ class ProgressTracker:
     
     def get_active_tasks(self) -> List[TaskProgress]:
         """Get all active (running) tasks."""
-        return [task for task in self.tasks.values() if task.status == TaskStatus.RUNNING]
+        with self.lock:
+            return [self.tasks[task_id] for task_id in self._by_status[TaskStatus.RUNNING]]
     
     def create_progress_display(self) -> Layout:
-        """Create a rich progress display layout."""
-        layout = Layout()
-        
-        # Header
-        header = Panel(
-            Align.center(Text("🤖 Deep Action Agent - Live Progress", style="bold blue")),
-            style="blue"
-        )
-        
-        # Task table
-        task_table = self._create_task_table()
-        
-        # Status summary
-        status_summary = self._create_status_summary()
+        """Return the rich progress layout with current task data filled in.
         
-        # Layout structure
-        layout.split_column(
-            Layout(header, size=3),
-            Layout(task_table, name="tasks"),
-            Layout(status_summary, size=8)
-        )
+        The layout, header and summary panel are built once; each call only
+        swaps in a fresh task table and summary text.
+        """
+        if self._layout is None:
+            header = Panel(
+                Align.center(Text("🤖 Deep Action Agent - Live Progress", style="bold blue")),
+                style="blue"
+            )
+            self._summary_panel = Panel("", title="Status Summary", style="green")
+            self._layout = Layout()
+            self._layout.split_column(
+                Layout(header, size=3),
+                Layout(name="tasks"),
+                Layout(self._summary_panel, size=8)
+            )
         
-        return layout
+        self._layout["tasks"].update(self._create_task_table())
+        self._summary_panel.renderable = self._create_status_summary()
+        return self._layout
     
     def _create_task_table(self) -> Table:
         """Create a table showing all tasks."""
@@ -272,17 +375,14 @@ class ProgressTracker:
         table.add_column("Current Step", style="white", width=40)
         table.add_column("Duration", style="magenta", width=12)
         
+        now = datetime.now()
         for task in self.get_active_tasks():
-            duration = datetime.now() - task.start_time
-            duration_str = str(duration).split('.')[0]  # Remove microseconds
+            # H:MM:SS, as str(timedelta) printed it, without the microseconds
+            minutes, seconds = divmod(int((now - task.start_time).total_seconds()), 60)
+            hours, minutes = divmod(minutes, 60)
+            duration_str = f"{hours}:{minutes:02d}:{seconds:02d}"
             
-            status_icon = {
-                TaskStatus.PENDING: "⏳",
-                TaskStatus.RUNNING: "🔄",
-                TaskStatus.COMPLETED: "✅",
-                TaskStatus.FAILED: "❌",
-                TaskStatus.CANCELLED: "🚫"
-            }.get(task.status, "❓")
+            status_icon = _STATUS_ICONS.get(task.status, "❓")
             
             progress_bar = f"{task.progress:.1%}"
             
@@ -297,17 +397,13 @@ class ProgressTracker:
         
         return table
     
-    def _create_status_summary(self) -> Panel:
-        """Create a status summary panel."""
-        active_tasks = self.get_active_tasks()
-        completed_tasks = [t for t in self.tasks.values() if t.status == TaskStatus.COMPLETED]
-        failed_tasks = [t for t in self.tasks.values() if t.status == TaskStatus.FAILED]
-        
+    def _create_status_summary(self) -> str:
+        """Create the status summary text."""
         summary_text = f"""
 📊 Task Summary:
-• Active: {len(active_tasks)} tasks
-• Completed: {len(completed_tasks)} tasks
-• Failed: {len(failed_tasks)} tasks
+• Active: {len(self._by_status[TaskStatus.RUNNING])} tasks
+• Completed: {len(self._by_status[TaskStatus.COMPLETED])} tasks
+• Failed: {len(self._by_status[TaskStatus.FAILED])} tasks
 • Total: {len(self.tasks)} tasks
 
 🕒 Last Update: {datetime.now().strftime('%H:%M:%S')}
@@ -318,7 +414,7 @@ class ProgressTracker:
 • Progress is saved automatically
         """
         
-        return Panel(summary_text, title="Status Summary", style="green")
+        return summary_text
     
     def start_live_display(self):
         """Start the live progress display."""
@@ -396,36 +492,33 @@ class ProgressTracker:
         
         report_path = self.progress_dir / f"{task_id}_report.md"
         
-        report_content = f"""# Task Progress Report
-
-## Task Information
-- **Task ID**: {task.task_id}
-- **Task Name**: {task.task_name}
-- **Status**: {task.status.value}
-- **Progress**: {task.progress:.1%}
-- **Start Time**: {task.start_time.strftime('%Y-%m-%d %H:%M:%S')}
-
-## Current Status
-- **Current Step**: {task.current_step}
-- **Step Progress**: {task.current_step_num}/{task.total_steps}
-- **Duration**: {datetime.now() - task.start_time}
-
-## Timeline
-- **Started**: {task.start_time.strftime('%H:%M:%S')}
-- **Last Update**: {datetime.now().strftime('%H:%M:%S')}
-- **Estimated Completion**: {task.estimated_completion.strftime('%H:%M:%S') if task.estimated_completion else 'Unknown'}
-
-## Metadata
-```json
-{json.dumps(task.metadata, indent=2, default=str)}
-```
-
----
-*Report generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*
-"""
+        now = datetime.now()
+        if orjson is not None:
+            metadata_json = orjson.dumps(task.metadata, default=str,
+                                         option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        else:
+            metadata_json = json.dumps(task.metadata, indent=2, default=str)
         
-        with open(report_path, 'w') as f:
-            f.write(report_content)
+        # Write the report piecewise instead of assembling it in one f-string
+        with open(report_path, 'w', encoding='utf-8', buffering=1 << 16) as f:
+            f.write("# Task Progress Report\n\n## Task Information\n")
+            f.write(f"- **Task ID**: {task.task_id}\n")
+            f.write(f"- **Task Name**: {task.task_name}\n")
+            f.write(f"- **Status**: {task.status.value}\n")
+            f.write(f"- **Progress**: {task.progress:.1%}\n")
+            f.write(f"- **Start Time**: {task.start_time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+            f.write("\n## Current Status\n")
+            f.write(f"- **Current Step**: {task.current_step}\n")
+            f.write(f"- **Step Progress**: {task.current_step_num}/{task.total_steps}\n")
+            f.write(f"- **Duration**: {now - task.start_time}\n")
+            f.write("\n## Timeline\n")
+            f.write(f"- **Started**: {task.start_time.strftime('%H:%M:%S')}\n")
+            f.write(f"- **Last Update**: {now.strftime('%H:%M:%S')}\n")
+            f.write(f"- **Estimated Completion**: {task.estimated_completion.strftime('%H:%M:%S') if task.estimated_completion else 'Unknown'}\n")
+            f.write("\n## Metadata\n```json\n")
+            f.write(metadata_json)
+            f.write("\n```\n\n---\n")
+            f.write(f"*Report generated on {now.strftime('%Y-%m-%d %H:%M:%S')}*\n")
         
         return str(report_path)
     
@@ -442,7 +535,8 @@ class ProgressTracker:
                     tasks_to_remove.append(task_id)
             
             for task_id in tasks_to_remove:
-                del self.tasks[task_id]
+                self._index_status(task_id, self.tasks.pop(task_id).status, None)
+                self._dirty.discard(task_id)
                 # Also remove the progress file
                 progress_file = self.progress_dir / f"{task_id}.json"
                 if progress_file.exists():
@@ -451,5 +545,13 @@ class ProgressTracker:
             if tasks_to_remove:
                 logger.info(f"Cleaned up {len(tasks_to_remove)} old tasks")
 
-# Global progress tracker instance
-progress_tracker = ProgressTracker() 
\ No newline at end of file
+@functools.lru_cache(maxsize=None)
+def get_progress_tracker() -> ProgressTracker:
+    """Shared progress tracker, created on first use."""
+    return ProgressTracker()
+
+def __getattr__(name: str):
+    # Keep `from tools.progress_tracker import progress_tracker` working
+    if name == "progress_tracker":
+        return get_progress_tracker()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Python Worker
+Long-lived interpreter used by the code interpreter to run snippets without
+paying interpreter startup on every call.
+
+Protocol: each request and response is a 4-byte big-endian length followed by
+a UTF-8 JSON object. Requests are {"code", "workspace", "jit", "max_output"};
+responses are {"stdout", "stderr", "returncode", "stdout_truncated",
+"stderr_truncated"}.
+"""
+
+import io
+import os
+import sys
+import ast
+import json
+import struct
+import hashlib
+import functools
+import importlib
+import selectors
+import threading
+import time
+import traceback
+from collections import OrderedDict
+
+_HEADER = struct.Struct(">I")
+
+
+def _open_protocol_streams():
+    """Move the protocol pipes off fds 0/1 so user code can't corrupt them.
+
+    fds 1 and 2 are pointed at a capture file for the duration of each snippet.
+    """
+    proto_in = os.fdopen(os.dup(0), "rb", buffering=0)
+    proto_out = os.fdopen(os.dup(1), "wb", buffering=0)
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    os.close(devnull)
+    return proto_in, proto_out
+
+
+def _read_exact(stream, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = stream.read(size - len(data))
+        if not chunk:
+            return b""
+        data += chunk
+    return data
+
+
+def read_message(stream):
+    header = _read_exact(stream, _HEADER.size)
+    if not header:
+        return None
+    (length,) = _HEADER.unpack(header)
+    return json.loads(_read_exact(stream, length).decode("utf-8"))
+
+
+def write_message(stream, message) -> None:
+    payload = json.dumps(message).encode("utf-8")
+    stream.write(_HEADER.pack(len(payload)) + payload)
+
+
+# Names a function may reference and still be considered safe to njit
+_JIT_GLOBALS = frozenset({"np", "numpy", "math", "range", "len", "abs", "min", "max", "float", "int", "bool"})
+_JIT_NODES = (
+    ast.FunctionDef, ast.arguments, ast.arg, ast.Return, ast.Assign, ast.AugAssign,
+    ast.For, ast.While, ast.If, ast.Break, ast.Continue, ast.Pass, ast.Expr,
+    ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.IfExp, ast.Call,
+    ast.Name, ast.Attribute, ast.Subscript, ast.Slice, ast.Tuple, ast.Constant,
+    ast.expr_context, ast.operator, ast.unaryop, ast.boolop, ast.cmpop,
+)
+if sys.version_info < (3, 9):
+    _JIT_NODES += (ast.Index, ast.ExtSlice)
+
+_numba = None
+_jit_cache = {}
+
+# Compiled code objects keyed by a hash of the raw snippet; retries of the
+# same snippet skip parsing and compilation entirely
+_CODE_CACHE_SIZE = 256
+_code_cache = OrderedDict()
+
+
+def _load_numba():
+    """Import numba on first use; returns None when it isn't installed."""
+    global _numba
+    if _numba is None:
+        try:
+            import numba
+            _numba = numba
+        except ImportError:
+            _numba = False
+    return _numba or None
+
+
+def _is_numeric_function(node: ast.FunctionDef) -> bool:
+    """True for undecorated functions built only from arithmetic/array operations."""
+    if node.decorator_list or node.args.vararg or node.args.kwarg or node.args.kwonlyargs:
+        return False
+
+    docstring = ast.get_docstring(node, clean=False) and node.body[0].value
+    local_names = {a.arg for a in node.args.args}
+    for child in ast.walk(node):
+        if not isinstance(child, _JIT_NODES):
+            return False
+        if isinstance(child, ast.Constant) and child is not docstring and not isinstance(child.value, (int, float, bool)):
+            return False
+        if isinstance(child, ast.Name) and isinstance(child.ctx, ast.Store):
+            local_names.add(child.id)
+
+    for child in ast.walk(node):
+        if isinstance(child, ast.Name) and child.id not in local_names and child.id not in _JIT_GLOBALS:
+            return False
+    return True
+
+
+def _jit(key: str):
+    """Decorator factory: njit the function, falling back to Python if numba can't type it."""
+    def decorator(func):
+        numba = _load_numba()
+        if numba is None:
+            return func
+
+        # Compiled dispatchers are reused across snippets with identical source;
+        # False marks functions numba failed to type
+        dispatcher = _jit_cache.get(key)
+        if dispatcher is None:
+            dispatcher = _jit_cache[key] = numba.njit(func)
+        if dispatcher is False:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _jit_cache[key] is not False:
+                try:
+                    return dispatcher(*args, **kwargs)
+                except numba.core.errors.NumbaError:
+                    _jit_cache[key] = False
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def compile_snippet(code: str, jit: bool = False):
+    """Return the (cached) code object for a snippet."""
+    key = hashlib.blake2b(code.encode("utf-8"), digest_size=16, person=b"jit" if jit else b"").digest()
+    code_obj = _code_cache.get(key)
+    if code_obj is not None:
+        _code_cache.move_to_end(key)
+        return code_obj
+
+    code_obj = _code_cache[key] = _compile_snippet(code, jit)
+    if len(_code_cache) > _CODE_CACHE_SIZE:
+        _code_cache.popitem(last=False)
+    return code_obj
+
+
+def _compile_snippet(code: str, jit: bool):
+    """Compile a snippet, decorating numeric top-level functions with _jit when requested."""
+    if not jit:
+        return compile(code, "<code>", "exec")
+
+    tree = ast.parse(code, "<code>")
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and _is_numeric_function(node):
+            key = hashlib.blake2b(ast.dump(node).encode("utf-8"), digest_size=16).hexdigest()
+            decorator = ast.Call(func=ast.Name(id="__jit__", ctx=ast.Load()), args=[ast.Constant(value=key)], keywords=[])
+            node.decorator_list.append(ast.copy_location(decorator, node))
+    ast.fix_missing_locations(tree)
+    return compile(tree, "<code>", "exec")
+
+
+# Once a snippet returns, output from processes it left running is drained
+# for at most this many seconds before the capture pipes are closed
+_DRAIN_GRACE = 0.1
+
+
+class _CappedCapture:
+    """Point fds 1 and 2 at pipes that a thread drains, keeping at most `limit` bytes of each.
+
+    Output past the limit is read and discarded, so writers never block and
+    nothing is spooled to memory or disk beyond the cap.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._saved = {}
+        self._pipes = {}
+        self._data = {}
+        self._sizes = {}
+        for fd in (1, 2):
+            read_end, write_end = os.pipe()
+            self._saved[fd] = os.dup(fd)
+            os.dup2(write_end, fd)
+            os.close(write_end)
+            self._pipes[read_end] = fd
+            self._data[fd] = bytearray()
+            self._sizes[fd] = 0
+        self._stop_at = None
+        self._thread = threading.Thread(target=self._pump, name="output-capture", daemon=True)
+        self._thread.start()
+
+    def _pump(self) -> None:
+        with selectors.DefaultSelector() as sel:
+            for read_end in self._pipes:
+                sel.register(read_end, selectors.EVENT_READ)
+            open_fds = len(self._pipes)
+            while open_fds:
+                stop_at = self._stop_at
+                if stop_at is not None and time.monotonic() >= stop_at:
+                    break
+                ready = sel.select(0.05 if stop_at is None else 0)
+                if not ready and stop_at is not None:
+                    break
+                for key, _ in ready:
+                    chunk = os.read(key.fd, 65536)
+                    if not chunk:
+                        sel.unregister(key.fd)
+                        open_fds -= 1
+                        continue
+                    fd = self._pipes[key.fd]
+                    self._sizes[fd] += len(chunk)
+                    room = self.limit - len(self._data[fd])
+                    if room > 0:
+                        self._data[fd] += chunk[:room]
+
+    def release(self):
+        """Restore fds 1 and 2; returns ((stdout, truncated), (stderr, truncated))."""
+        for fd, saved in self._saved.items():
+            os.dup2(saved, fd)
+            os.close(saved)
+        # Both pipes normally hit EOF now; a background process still holding
+        # one gets a short grace period, then loses its reader
+        self._stop_at = time.monotonic() + _DRAIN_GRACE
+        self._thread.join()
+        for read_end in self._pipes:
+            os.close(read_end)
+        return tuple((bytes(self._data[fd]).decode("utf-8", "replace"), self._sizes[fd] > self.limit)
+                     for fd in (1, 2))
+
+
+def _fd_text_stream(fd: int) -> io.TextIOWrapper:
+    # write_through keeps print() ordered with writes made to the fd directly
+    return io.TextIOWrapper(io.FileIO(fd, "w", closefd=False), encoding="utf-8",
+                            errors="backslashreplace", write_through=True)
+
+
+def _purge_workspace_modules(workspace: str) -> None:
+    """Forget modules imported from the workspace so edited files are re-imported."""
+    root = os.path.join(os.path.abspath(workspace), "")
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, "__file__", None)
+        if path and os.path.abspath(path).startswith(root):
+            del sys.modules[name]
+    importlib.invalidate_caches()
+
+
+def run_snippet(code: str, workspace: str, jit: bool = False, max_output: int = 1024 * 1024):
+    """Execute code in a fresh namespace and return the response message.
+
+    Output is captured at the file-descriptor level, so writes from child
+    processes and C extensions are kept alongside print(); each stream is
+    capped at max_output bytes as it is captured.
+    """
+    saved_path = list(sys.path)
+    saved_streams = sys.stdout, sys.stderr
+    returncode = 0
+
+    namespace = {
+        "__name__": "__main__",
+        "__builtins__": __builtins__,
+        "sys": sys,
+        "os": os,
+        "json": json,
+        "WORKSPACE_PATH": workspace,
+        "__jit__": _jit,
+    }
+    capture = _CappedCapture(max_output)
+    sys.stdout, sys.stderr = _fd_text_stream(1), _fd_text_stream(2)
+    try:
+        from pathlib import Path
+        namespace["Path"] = Path
+        # The worker runs one snippet at a time, so a process-wide chdir is safe
+        os.chdir(workspace)
+        sys.path.insert(0, workspace)
+        _purge_workspace_modules(workspace)
+        sys.stdin = io.StringIO()
+        try:
+            exec(compile_snippet(code, jit), namespace)
+        except SystemExit as e:
+            if e.code is None:
+                returncode = 0
+            elif isinstance(e.code, int):
+                returncode = e.code
+            else:
+                print(e.code, file=sys.stderr)
+                returncode = 1
+        except BaseException as e:
+            # Drop this module's frame so the traceback starts at user code
+            traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+            returncode = 1
+    except Exception:
+        sys.stderr.write(traceback.format_exc())
+        returncode = 1
+    finally:
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.flush()
+            except Exception:
+                pass
+        sys.stdout, sys.stderr = saved_streams
+        sys.stdin = sys.__stdin__
+        sys.path[:] = saved_path
+
+    (stdout, stdout_truncated), (stderr, stderr_truncated) = capture.release()
+    return {
+        "stdout": stdout,
+        "stderr": stderr,
+        "returncode": returncode,
+        "stdout_truncated": stdout_truncated,
+        "stderr_truncated": stderr_truncated,
+    }
+
+
+def main() -> None:
+    # Don't let modules next to this script shadow user imports
+    if sys.path and os.path.abspath(sys.path[0]) == os.path.dirname(os.path.abspath(__file__)):
+        sys.path.pop(0)
+
+    proto_in, proto_out = _open_protocol_streams()
+    while True:
+        request = read_message(proto_in)
+        if request is None:
+            break
+        write_message(proto_out, run_snippet(request["code"], request["workspace"], request.get("jit", False),
+                                             request.get("max_output", 1024 * 1024)))
+
+
+if __name__ == "__main__":
+    main()
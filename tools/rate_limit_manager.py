@@ -7,14 +7,21 @@ Provides sophisticated rate limiting with exponential backoff, jitter, and fallb
 import time
 import random
 import asyncio
-from typing import Dict, List, Optional, Callable, Any
+from typing import Dict, List, Optional, Callable, Any, Tuple
 from datetime import datetime, timedelta
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 import threading
+import itertools
+import functools
 from collections import defaultdict
 from loguru import logger
 
+# Seconds after a failure during which a provider is skipped
+RECENT_FAILURE_WINDOW = 30.0
+# Seconds after a success during which get_best_provider favours a provider
+RECENT_SUCCESS_WINDOW = 300.0
+
 class RateLimitStrategy(Enum):
     """Rate limiting strategies."""
     EXPONENTIAL_BACKOFF = "exponential_backoff"
@@ -31,26 +38,73 @@ class RateLimitConfig:
     jitter_factor: float = 0.1
     strategy: RateLimitStrategy = RateLimitStrategy.EXPONENTIAL_BACKOFF
     success_threshold: int = 5  # Reset backoff after N successful calls
+    # delay_fn(attempt, stats) for this strategy, before jitter
+    delay_fn: Callable[[int, 'ProviderStats'], float] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self.delay_fn = _build_delay_fn(self)
+
+def _build_delay_fn(config: RateLimitConfig) -> Callable[[int, 'ProviderStats'], float]:
+    """Resolve the strategy branch once, returning the un-jittered delay curve."""
+    base, cap = config.base_delay, config.max_delay
+    
+    def exponential(attempt: int, stats: 'ProviderStats') -> float:
+        return min(base * (1 << attempt), cap)
+    
+    if config.strategy == RateLimitStrategy.EXPONENTIAL_BACKOFF:
+        return exponential
+    if config.strategy == RateLimitStrategy.LINEAR_BACKOFF:
+        return lambda attempt, stats: min(base * attempt, cap)
+    if config.strategy == RateLimitStrategy.ADAPTIVE:
+        # Adaptive strategy based on failure rate
+        def adaptive(attempt: int, stats: 'ProviderStats') -> float:
+            failure_rate = stats.failure_count / max(stats.success_count + stats.failure_count, 1)
+            return exponential(attempt, stats) if failure_rate > 0.5 else base
+        return adaptive
+    return lambda attempt, stats: base
+
+class ProviderStats:
+    """Call statistics for one provider, guarded by their own lock."""
+    __slots__ = ('success_count', 'failure_count', 'last_success', 'last_failure',
+                 'current_backoff', 'consecutive_failures', 'last_success_mono',
+                 'last_failure_mono', 'lock')
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        self.success_count = 0
+        self.failure_count = 0
+        self.last_success: Optional[datetime] = None
+        self.last_failure: Optional[datetime] = None
+        self.current_backoff = 0
+        self.consecutive_failures = 0
+        # time.monotonic() of the last success/failure, for cheap recency checks
+        self.last_success_mono = float('-inf')
+        self.last_failure_mono = float('-inf')
 
 class RateLimitManager:
     """Sophisticated rate limiting manager with multiple strategies."""
     
     def __init__(self):
         self.providers = defaultdict(lambda: RateLimitConfig())
-        self.provider_stats = defaultdict(lambda: {
-            'success_count': 0,
-            'failure_count': 0,
-            'last_success': None,
-            'last_failure': None,
-            'current_backoff': 0,
-            'consecutive_failures': 0
-        })
+        self.provider_stats: Dict[str, ProviderStats] = defaultdict(ProviderStats)
         self.lock = threading.Lock()
         self.callback = None
+        # Bumped after every stats/config change; get_best_provider caches
+        # its pick per provider list until the version or a time window moves
+        self._versions = itertools.count(1)
+        self._version = 0
+        self._best_cache: Dict[tuple, tuple] = {}
+        
+    def _changed(self):
+        self._version = next(self._versions)
         
     def configure_provider(self, provider: str, config: RateLimitConfig):
         """Configure rate limiting for a specific provider."""
         self.providers[provider] = config
+        self._changed()
         
     def add_callback(self, callback: Callable[[str, str, float], None]):
         """Add a callback for rate limit events."""
@@ -64,86 +118,82 @@ class RateLimitManager:
             except Exception as e:
                 logger.error(f"Rate limit callback error: {e}")
     
-    def _calculate_delay(self, provider: str, attempt: int) -> float:
+    def _calculate_delay(self, config: RateLimitConfig, stats: ProviderStats, attempt: int) -> float:
         """Calculate delay based on strategy and attempt number."""
-        config = self.providers[provider]
-        stats = self.provider_stats[provider]
+        delay = config.delay_fn(attempt, stats)
         
-        if config.strategy == RateLimitStrategy.EXPONENTIAL_BACKOFF:
-            delay = min(config.base_delay * (2 ** attempt), config.max_delay)
-        elif config.strategy == RateLimitStrategy.LINEAR_BACKOFF:
-            delay = min(config.base_delay * attempt, config.max_delay)
-        elif config.strategy == RateLimitStrategy.FIXED_DELAY:
-            delay = config.base_delay
-        elif config.strategy == RateLimitStrategy.ADAPTIVE:
-            # Adaptive strategy based on failure rate
-            failure_rate = stats['failure_count'] / max(stats['success_count'] + stats['failure_count'], 1)
-            if failure_rate > 0.5:
-                delay = min(config.base_delay * (2 ** attempt), config.max_delay)
-            else:
-                delay = config.base_delay
-        else:
-            delay = config.base_delay
-            
         # Add jitter to prevent thundering herd
-        jitter = delay * config.jitter_factor * random.uniform(-1, 1)
+        jitter = delay * config.jitter_factor * (random.random() * 2 - 1)
         delay = max(0, delay + jitter)
         
         return delay
     
+    def _get_stats(self, provider: str) -> ProviderStats:
+        """Return the provider's stats, creating them under the manager lock once."""
+        stats = self.provider_stats.get(provider)
+        if stats is None:
+            with self.lock:
+                stats = self.provider_stats[provider]
+        return stats
+    
     def record_success(self, provider: str):
         """Record a successful API call."""
-        with self.lock:
-            stats = self.provider_stats[provider]
-            stats['success_count'] += 1
-            stats['last_success'] = datetime.now()
-            stats['consecutive_failures'] = 0
+        stats = self._get_stats(provider)
+        threshold = self.providers[provider].success_threshold
+        with stats.lock:
+            stats.success_count += 1
+            stats.last_success = datetime.now()
+            stats.last_success_mono = time.monotonic()
+            stats.consecutive_failures = 0
             
             # Reset backoff after success threshold
-            if stats['success_count'] % self.providers[provider].success_threshold == 0:
-                stats['current_backoff'] = 0
+            if stats.success_count % threshold == 0:
+                stats.current_backoff = 0
+            total = stats.success_count
+        self._changed()
                 
-            logger.debug(f"Provider {provider} success recorded. Total: {stats['success_count']}")
+        logger.debug(f"Provider {provider} success recorded. Total: {total}")
     
     def record_failure(self, provider: str, error_type: str = "unknown"):
         """Record a failed API call."""
-        with self.lock:
-            stats = self.provider_stats[provider]
-            stats['failure_count'] += 1
-            stats['last_failure'] = datetime.now()
-            stats['consecutive_failures'] += 1
+        stats = self._get_stats(provider)
+        with stats.lock:
+            stats.failure_count += 1
+            stats.last_failure = datetime.now()
+            stats.last_failure_mono = time.monotonic()
+            stats.consecutive_failures += 1
+            consecutive = stats.consecutive_failures
+        self._changed()
             
-            logger.warning(f"Provider {provider} failure recorded. Error: {error_type}. Consecutive: {stats['consecutive_failures']}")
+        logger.warning(f"Provider {provider} failure recorded. Error: {error_type}. Consecutive: {consecutive}")
     
     def should_skip_provider(self, provider: str) -> bool:
         """Check if provider should be skipped due to recent failures."""
-        stats = self.provider_stats[provider]
-        config = self.providers[provider]
-        
+        return self._should_skip(self.providers[provider], self._get_stats(provider))
+    
+    @staticmethod
+    def _should_skip(config: RateLimitConfig, stats: ProviderStats) -> bool:
         # Skip if too many consecutive failures
-        if stats['consecutive_failures'] >= config.max_retries * 2:
+        if stats.consecutive_failures >= config.max_retries * 2:
             return True
             
         # Skip if last failure was very recent
-        if stats['last_failure'] and (datetime.now() - stats['last_failure']).seconds < 30:
-            return True
-            
-        return False
+        return time.monotonic() - stats.last_failure_mono < RECENT_FAILURE_WINDOW
     
     def get_provider_health(self, provider: str) -> Dict[str, Any]:
         """Get health metrics for a provider."""
-        stats = self.provider_stats[provider]
-        total_calls = stats['success_count'] + stats['failure_count']
+        stats = self._get_stats(provider)
+        total_calls = stats.success_count + stats.failure_count
         
         return {
             'provider': provider,
-            'success_rate': stats['success_count'] / max(total_calls, 1),
+            'success_rate': stats.success_count / max(total_calls, 1),
             'total_calls': total_calls,
-            'consecutive_failures': stats['consecutive_failures'],
-            'last_success': stats['last_success'],
-            'last_failure': stats['last_failure'],
-            'current_backoff': stats['current_backoff'],
-            'is_healthy': not self.should_skip_provider(provider)
+            'consecutive_failures': stats.consecutive_failures,
+            'last_success': stats.last_success,
+            'last_failure': stats.last_failure,
+            'current_backoff': stats.current_backoff,
+            'is_healthy': not self._should_skip(self.providers[provider], stats)
         }
     
     async def execute_with_backoff(self, func: Callable, provider: str, *args, **kwargs):
@@ -162,17 +212,19 @@ class RateLimitManager:
             Exception: If all retries fail
         """
         config = self.providers[provider]
+        stats = self._get_stats(provider)
+        is_async = asyncio.iscoroutinefunction(func)
         last_exception = None
         
         for attempt in range(config.max_retries + 1):
             try:
                 # Check if we should skip this provider
-                if self.should_skip_provider(provider):
+                if self._should_skip(config, stats):
                     logger.warning(f"Skipping provider {provider} due to recent failures")
                     raise Exception(f"Provider {provider} is temporarily unavailable")
                 
                 # Execute the function
-                result = await func(*args, **kwargs) if asyncio.iscoroutinefunction(func) else func(*args, **kwargs)
+                result = await func(*args, **kwargs) if is_async else func(*args, **kwargs)
                 
                 # Record success
                 self.record_success(provider)
@@ -187,7 +239,7 @@ class RateLimitManager:
                 
                 # Check if we should retry
                 if attempt < config.max_retries:
-                    delay = self._calculate_delay(provider, attempt)
+                    delay = self._calculate_delay(config, stats, attempt)
                     
                     logger.warning(f"Provider {provider} attempt {attempt + 1} failed: {error_type}. "
                                  f"Retrying in {delay:.2f}s...")
@@ -195,7 +247,7 @@ class RateLimitManager:
                     self._notify_callback(provider, "retry", delay)
                     
                     # Wait before retry
-                    await asyncio.sleep(delay) if asyncio.iscoroutinefunction(func) else time.sleep(delay)
+                    await asyncio.sleep(delay) if is_async else time.sleep(delay)
                 else:
                     logger.error(f"Provider {provider} failed after {config.max_retries} attempts: {error_type}")
                     self._notify_callback(provider, "final_failure", 0)
@@ -203,7 +255,7 @@ class RateLimitManager:
         # All retries failed
         raise last_exception
     
-    def execute_with_fallback(self, primary_func: Callable, fallback_func: Callable, 
+    async def execute_with_fallback(self, primary_func: Callable, fallback_func: Callable, 
                             primary_provider: str, fallback_provider: str, *args, **kwargs):
         """
         Execute with fallback to another provider.
@@ -219,10 +271,61 @@ class RateLimitManager:
             Result from either function
         """
         try:
-            return self.execute_with_backoff(primary_func, primary_provider, *args, **kwargs)
+            return await self.execute_with_backoff(primary_func, primary_provider, *args, **kwargs)
         except Exception as e:
             logger.warning(f"Primary provider {primary_provider} failed, trying fallback {fallback_provider}: {e}")
-            return self.execute_with_backoff(fallback_func, fallback_provider, *args, **kwargs)
+            return await self.execute_with_backoff(fallback_func, fallback_provider, *args, **kwargs)
+    
+    async def execute_hedged(self, funcs: List[Tuple[Callable, str]], *args,
+                             hedge_delay: float = 0.2, **kwargs):
+        """
+        Race several providers, starting each one hedge_delay seconds after the previous.
+        
+        Args:
+            funcs: (function, provider name) pairs in order of preference
+            hedge_delay: Seconds to wait before starting each next provider
+            *args, **kwargs: Arguments for the functions
+            
+        Returns:
+            Result of the first provider to succeed; the others are cancelled
+            
+        Raises:
+            Exception: The last error if every provider fails
+        
+        Sync functions run in the default executor so they can overlap; a
+        losing sync call can't be interrupted and finishes in the background
+        with its result discarded.
+        """
+        loop = asyncio.get_running_loop()
+        
+        def in_executor(func: Callable) -> Callable:
+            if asyncio.iscoroutinefunction(func):
+                return func
+            
+            async def run(*args, **kwargs):
+                return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+            return run
+        
+        async def attempt(index: int, func: Callable, provider: str):
+            if index:
+                await asyncio.sleep(hedge_delay * index)
+            return await self.execute_with_backoff(in_executor(func), provider, *args, **kwargs)
+        
+        pending = {asyncio.ensure_future(attempt(i, func, provider))
+                   for i, (func, provider) in enumerate(funcs)}
+        last_exception = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    last_exception = task.exception()
+                    logger.warning(f"Hedged provider failed, {len(pending)} still running: {last_exception}")
+        finally:
+            for task in pending:
+                task.cancel()
+        raise last_exception or Exception("No providers given")
     
     def get_health_report(self) -> Dict[str, Dict[str, Any]]:
         """Get health report for all providers."""
@@ -230,58 +333,78 @@ class RateLimitManager:
     
     def reset_provider(self, provider: str):
         """Reset statistics for a provider."""
-        with self.lock:
-            self.provider_stats[provider] = {
-                'success_count': 0,
-                'failure_count': 0,
-                'last_success': None,
-                'last_failure': None,
-                'current_backoff': 0,
-                'consecutive_failures': 0
-            }
-            logger.info(f"Reset statistics for provider {provider}")
+        stats = self._get_stats(provider)
+        with stats.lock:
+            stats.reset()
+        self._changed()
+        logger.info(f"Reset statistics for provider {provider}")
     
     def get_best_provider(self, providers: List[str]) -> Optional[str]:
         """Get the healthiest provider from a list."""
+        key = tuple(providers)
+        version = self._version
+        now = time.monotonic()
+        cached = self._best_cache.get(key)
+        if cached and cached[0] == version and now < cached[1]:
+            return cached[2]
+        
         best_provider = None
         best_score = -1
+        # The pick can also change once a failure or success ages out of its window
+        valid_until = float('inf')
         
         for provider in providers:
             if provider not in self.providers:
                 continue
-                
-            health = self.get_provider_health(provider)
-            if not health['is_healthy']:
+            
+            config = self.providers[provider]
+            stats = self._get_stats(provider)
+            failure_expiry = stats.last_failure_mono + RECENT_FAILURE_WINDOW
+            success_expiry = stats.last_success_mono + RECENT_SUCCESS_WINDOW
+            if now < failure_expiry:
+                valid_until = min(valid_until, failure_expiry)
+            if now < success_expiry:
+                valid_until = min(valid_until, success_expiry)
+            
+            if self._should_skip(config, stats):
                 continue
                 
             # Score based on success rate and recent activity
-            score = health['success_rate']
-            if health['last_success']:
-                # Bonus for recent success
-                time_since_success = (datetime.now() - health['last_success']).seconds
-                if time_since_success < 300:  # 5 minutes
-                    score += 0.1
+            score = stats.success_count / max(stats.success_count + stats.failure_count, 1)
+            # Bonus for recent success
+            if now < success_expiry:
+                score += 0.1
                     
             if score > best_score:
                 best_score = score
                 best_provider = provider
-                
+        
+        self._best_cache[key] = (version, valid_until, best_provider)
         return best_provider
 
-# Global rate limit manager instance
-rate_limit_manager = RateLimitManager()
-
-# Configure default providers
-rate_limit_manager.configure_provider('gemini', RateLimitConfig(
-    max_retries=3,
-    base_delay=2.0,
-    max_delay=30.0,
-    strategy=RateLimitStrategy.EXPONENTIAL_BACKOFF
-))
+@functools.lru_cache(maxsize=None)
+def get_rate_limit_manager() -> RateLimitManager:
+    """Shared rate limit manager, created with the default providers on first use."""
+    manager = RateLimitManager()
+    
+    # Configure default providers
+    manager.configure_provider('gemini', RateLimitConfig(
+        max_retries=3,
+        base_delay=2.0,
+        max_delay=30.0,
+        strategy=RateLimitStrategy.EXPONENTIAL_BACKOFF
+    ))
+    
+    manager.configure_provider('openrouter', RateLimitConfig(
+        max_retries=3,
+        base_delay=1.0,
+        max_delay=15.0,
+        strategy=RateLimitStrategy.EXPONENTIAL_BACKOFF
+    ))
+    return manager
 
-rate_limit_manager.configure_provider('openrouter', RateLimitConfig(
-    max_retries=3,
-    base_delay=1.0,
-    max_delay=15.0,
-    strategy=RateLimitStrategy.EXPONENTIAL_BACKOFF
-)) 
\ No newline at end of file
+def __getattr__(name: str):
+    # Keep `from tools.rate_limit_manager import rate_limit_manager` working
+    if name == 'rate_limit_manager':
+        return get_rate_limit_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")